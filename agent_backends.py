@@ -0,0 +1,412 @@
+# agent_backends.py
+"""
+Agent storage backends for AI Agent Manager
+Where agent prompts live: Google Docs in a Drive folder, a local directory of
+markdown files, or a local directory mirrored from Drive
+"""
+
+import io
+import logging
+import os
+import re
+import secrets
+import threading
+import time
+from datetime import datetime, timezone
+
+from googleapiclient.http import MediaIoBaseUpload
+
+import tracing
+from google_clients import DOC_MIME_TYPE, create_doc
+
+logger = logging.getLogger(__name__)
+
+# Overridden by the "storage" section of config.json
+STORAGE_DEFAULTS = {
+    'backend': 'drive',
+    'directory': 'agents',
+    'mirror_from_drive': False
+}
+BACKENDS = ('drive', 'local')
+
+# Drive files.list maximum page size
+MAX_PAGE_SIZE = 1000
+
+# Drive metadata needed to serve and cache-validate an agent
+METADATA_FIELDS = 'name, modifiedTime, headRevisionId'
+LISTING_FIELDS = 'nextPageToken, files(id, name, modifiedTime, headRevisionId)'
+
+# Docs API field mask - only the text runs extract_doc_text reads
+DOC_TEXT_FIELDS = 'body/content/paragraph/elements/textRun/content'
+
+# Prompt extraction engines: Docs API structural JSON, or Drive export of the doc as text
+EXTRACTION_ENGINES = ('docs', 'export')
+EXPORT_MIME_TYPES = ('text/plain', 'text/markdown')
+
+# Local agent files: <id>.md, optionally starting with a "name:" front matter block
+AGENT_FILE_SUFFIX = '.md'
+FRONT_MATTER = re.compile(r'\A---\n(.*?)\n---\n\n?', re.DOTALL)
+
+class AgentNotFound(LookupError):
+    """Raised by a backend when an agent doesn't exist"""
+
+class AgentBackend:
+    """Storage interface - list, get, create, update and metadata for agents"""
+
+    name = None
+
+    # Pattern agent IDs must match before they reach the backend
+    id_pattern = r'^[a-zA-Z0-9\-_]{20,100}$'
+
+    # True if get() fetches metadata and prompt in one round trip - otherwise
+    # callers issue metadata() and content() concurrently
+    combined_get = False
+
+    def list_page(self, page_size=MAX_PAGE_SIZE, page_token=None):
+        """One page of agents by name, returns (files, next_page_token)"""
+        raise NotImplementedError
+
+    def list_all(self):
+        """Every agent, following all pages"""
+        files, next_token = self.list_page()
+        while next_token:
+            page, next_token = self.list_page(page_token=next_token)
+            files.extend(page)
+        return files
+
+    def metadata(self, agent_id):
+        """Agent name, modifiedTime and headRevisionId (cheap - used to validate caches)"""
+        raise NotImplementedError
+
+    def content(self, agent_id):
+        """Agent prompt text"""
+        raise NotImplementedError
+
+    def get(self, agent_id):
+        """Agent metadata and prompt, returns (metadata, prompt)"""
+        return self.metadata(agent_id), self.content(agent_id)
+
+    def create(self, name, content):
+        """Create an agent, returns its id, name and modifiedTime"""
+        raise NotImplementedError
+
+    def update(self, agent_id, content, name=None):
+        """Replace an agent's prompt (and optionally rename it), returns its new metadata"""
+        raise NotImplementedError
+
+    def url(self, agent_id):
+        """Where a user can open the agent to edit it, if anywhere"""
+        return None
+
+    def apply_change(self, file):
+        """Drive changes watcher reported an edit - returns the listing entry to cache"""
+        return file
+
+    def apply_remove(self, agent_id):
+        """Drive changes watcher reported a removal"""
+
+def extract_doc_text(doc):
+    """Extract plain text from a Google Docs document resource"""
+    content = []
+    for element in doc.get('body', {}).get('content', []):
+        if 'paragraph' in element:
+            for text_run in element['paragraph'].get('elements', []):
+                if 'textRun' in text_run:
+                    content.append(text_run['textRun']['content'])
+
+    return ''.join(content)
+
+def decode_export(data):
+    """Decode a Drive text export into prompt text"""
+    if isinstance(data, bytes):
+        data = data.decode('utf-8')
+    # Exports start with a BOM and use Windows line endings
+    return data.lstrip('\ufeff').replace('\r\n', '\n')
+
+def execute_measured(api_request):
+    """Execute a Google API request, returns (result, payload_bytes, parse_seconds)"""
+    measured = {'bytes': 0, 'parse': 0.0}
+    postproc = api_request.postproc
+
+    def measuring_postproc(resp, content):
+        start = time.perf_counter()
+        with tracing.span('parse'):
+            result = postproc(resp, content)
+        measured['parse'] = time.perf_counter() - start
+        measured['bytes'] = len(content or b'')
+        return result
+
+    api_request.postproc = measuring_postproc
+    result = api_request.execute()
+    return result, measured['bytes'], measured['parse']
+
+class DriveBackend(AgentBackend):
+    """Agents as Google Docs in one Drive folder"""
+
+    name = 'drive'
+
+    def __init__(self, drive, docs, folder_id, engine='docs', export_mime_type='text/plain', field_mask=True):
+        self.drive = drive
+        self.docs = docs
+        self.folder_id = folder_id
+        self.engine = engine if engine in EXTRACTION_ENGINES else 'docs'
+        self.export_mime_type = export_mime_type if export_mime_type in EXPORT_MIME_TYPES else 'text/plain'
+        self.field_mask = field_mask
+
+    def folder_query(self):
+        """Drive query for all agent docs in the agent folder"""
+        return f"'{self.folder_id}' in parents and mimeType='{DOC_MIME_TYPE}' and trashed=false"
+
+    def list_page(self, page_size=MAX_PAGE_SIZE, page_token=None):
+        results = self.drive.files().list(
+            q=self.folder_query(),
+            fields=LISTING_FIELDS,
+            orderBy='name',
+            pageSize=page_size,
+            pageToken=page_token
+        ).execute()
+
+        return results.get('files', []), results.get('nextPageToken')
+
+    def metadata(self, agent_id):
+        return self.drive.files().get(fileId=agent_id, fields=METADATA_FIELDS).execute()
+
+    def content(self, agent_id):
+        """Agent prompt text, with the configured extraction engine"""
+        if self.engine == 'export':
+            data = self.drive.files().export(fileId=agent_id, mimeType=self.export_mime_type).execute()
+            return decode_export(data)
+
+        params = {'documentId': agent_id}
+        if self.field_mask:
+            params['fields'] = DOC_TEXT_FIELDS
+
+        doc, payload_bytes, parse_seconds = execute_measured(self.docs.documents().get(**params))
+
+        start = time.perf_counter()
+        with tracing.span('extract'):
+            prompt = extract_doc_text(doc)
+        extract_seconds = time.perf_counter() - start
+
+        logger.info(
+            f"Docs fetch {agent_id}: {payload_bytes} bytes for {len(prompt)} chars, "
+            f"parse {parse_seconds * 1000:.2f} ms, extract {extract_seconds * 1000:.2f} ms "
+            f"(field mask {'on' if self.field_mask else 'off'})"
+        )
+        return prompt
+
+    def create(self, name, content):
+        return create_doc(self.drive, name, content, parent_id=self.folder_id)
+
+    def update(self, agent_id, content, name=None):
+        media = MediaIoBaseUpload(io.BytesIO(content.encode('utf-8')), mimetype='text/plain', resumable=False)
+        return self.drive.files().update(
+            fileId=agent_id,
+            body={'name': name} if name else {},
+            media_body=media,
+            fields=f'id, {METADATA_FIELDS}'
+        ).execute()
+
+    def url(self, agent_id):
+        return f"https://docs.google.com/document/d/{agent_id}"
+
+def drive_time(timestamp):
+    """Unix timestamp as a Drive-style RFC 3339 UTC time"""
+    moment = datetime.fromtimestamp(timestamp, timezone.utc)
+    return moment.strftime('%Y-%m-%dT%H:%M:%S.') + f"{moment.microsecond // 1000:03d}Z"
+
+def parse_drive_time(value):
+    """Drive RFC 3339 UTC time as a Unix timestamp"""
+    return datetime.strptime(value, '%Y-%m-%dT%H:%M:%S.%fZ').replace(tzinfo=timezone.utc).timestamp()
+
+class LocalBackend(AgentBackend):
+    """Agents as <id>.md files in a local directory - no network round trips"""
+
+    name = 'local'
+
+    # File names become IDs, so any plain token will do
+    id_pattern = r'^[a-zA-Z0-9\-_]{1,100}$'
+
+    # A file read returns both at once
+    combined_get = True
+
+    def __init__(self, directory):
+        self.directory = os.path.abspath(directory)
+        os.makedirs(self.directory, exist_ok=True)
+        # path -> (mtime_ns, size, name), so listings only re-read changed files
+        self._names = {}
+        self._lock = threading.Lock()
+
+    def path(self, agent_id):
+        """File holding an agent"""
+        if not re.match(self.id_pattern, agent_id):
+            raise AgentNotFound(agent_id)
+        return os.path.join(self.directory, agent_id + AGENT_FILE_SUFFIX)
+
+    def _stat(self, agent_id):
+        try:
+            return os.stat(self.path(agent_id))
+        except FileNotFoundError:
+            raise AgentNotFound(agent_id) from None
+
+    @staticmethod
+    def _file_metadata(agent_id, name, stat):
+        """Drive-shaped metadata for a local file (revision changes with every write)"""
+        return {
+            'id': agent_id,
+            'name': name,
+            'modifiedTime': drive_time(stat.st_mtime),
+            'headRevisionId': f"{stat.st_mtime_ns:x}-{stat.st_size:x}"
+        }
+
+    @staticmethod
+    def parse(agent_id, text):
+        """Split a file into (name, prompt) - name from front matter, first heading, or the ID"""
+        match = FRONT_MATTER.match(text)
+        if match:
+            for line in match.group(1).splitlines():
+                key, _, value = line.partition(':')
+                if key.strip() == 'name' and value.strip():
+                    return value.strip(), text[match.end():]
+            text = text[match.end():]
+
+        for line in text.splitlines():
+            if line.startswith('# '):
+                return line[2:].strip(), text
+            if line.strip():
+                break
+        return agent_id, text
+
+    def _read(self, agent_id):
+        """Returns (name, prompt, stat)"""
+        path = self.path(agent_id)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                stat = os.fstat(f.fileno())
+                text = f.read()
+        except FileNotFoundError:
+            raise AgentNotFound(agent_id) from None
+
+        name, prompt = self.parse(agent_id, text)
+        with self._lock:
+            self._names[path] = (stat.st_mtime_ns, stat.st_size, name)
+        return name, prompt, stat
+
+    def _name(self, agent_id, stat):
+        """Agent name, read from the file only if it changed since last time"""
+        cached = self._names.get(self.path(agent_id))
+        if cached and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            return cached[2]
+        return self._read(agent_id)[0]
+
+    def list_page(self, page_size=MAX_PAGE_SIZE, page_token=None):
+        files = []
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                agent_id, suffix = os.path.splitext(entry.name)
+                if suffix != AGENT_FILE_SUFFIX or not entry.is_file() or not re.match(self.id_pattern, agent_id):
+                    continue
+                try:
+                    stat = entry.stat()
+                    files.append(self._file_metadata(agent_id, self._name(agent_id, stat), stat))
+                except AgentNotFound:
+                    # Deleted while listing
+                    continue
+
+        files.sort(key=lambda file: (file['name'].lower(), file['id']))
+
+        # Page tokens are plain offsets into the sorted listing
+        start = int(page_token) if page_token and page_token.isdigit() else 0
+        end = start + page_size
+        return files[start:end], (str(end) if end < len(files) else None)
+
+    def metadata(self, agent_id):
+        stat = self._stat(agent_id)
+        return self._file_metadata(agent_id, self._name(agent_id, stat), stat)
+
+    def content(self, agent_id):
+        return self._read(agent_id)[1]
+
+    def get(self, agent_id):
+        name, prompt, stat = self._read(agent_id)
+        return self._file_metadata(agent_id, name, stat), prompt
+
+    def put(self, agent_id, name, content, modified=None):
+        """Write an agent file atomically, optionally stamped with a Drive modifiedTime"""
+        path = self.path(agent_id)
+        tmp_path = f"{path}.{secrets.token_hex(4)}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8', newline='\n') as f:
+            f.write(f"---\nname: {name}\n---\n\n{content}")
+        if modified:
+            timestamp = parse_drive_time(modified)
+            os.utime(tmp_path, (timestamp, timestamp))
+        os.replace(tmp_path, path)
+        return self.metadata(agent_id)
+
+    def create(self, name, content):
+        agent_id = secrets.token_urlsafe(24)
+        created = self.put(agent_id, name, content)
+        return {'id': agent_id, 'name': created['name'], 'modifiedTime': created['modifiedTime']}
+
+    def update(self, agent_id, content, name=None):
+        if name is None:
+            name = self.metadata(agent_id)['name']
+        else:
+            self._stat(agent_id)
+        return self.put(agent_id, name, content)
+
+    def remove(self, agent_id):
+        """Delete an agent file, True if it existed"""
+        try:
+            os.remove(self.path(agent_id))
+            return True
+        except (FileNotFoundError, AgentNotFound):
+            return False
+
+class MirrorBackend(LocalBackend):
+    """Local directory kept in step with the Drive folder - reads are local, writes go to Drive first"""
+
+    name = 'mirror'
+
+    # Mirrored files are named by their Google Doc IDs
+    id_pattern = AgentBackend.id_pattern
+
+    def __init__(self, directory, source):
+        super().__init__(directory)
+        self.source = source
+
+    def sync(self):
+        """Copy new and edited agents from Drive and drop deleted ones, returns (copied, removed)"""
+        remote = self.source.list_all()
+        local = {file['id']: file for file in self.list_all()}
+
+        copied = 0
+        for file in remote:
+            # Local files carry Drive's modifiedTime, so unchanged agents are skipped
+            existing = local.pop(file['id'], None)
+            if existing and existing['modifiedTime'] == file.get('modifiedTime') and existing['name'] == file['name']:
+                continue
+            self.put(file['id'], file['name'], self.source.content(file['id']), file.get('modifiedTime'))
+            copied += 1
+
+        removed = sum(self.remove(agent_id) for agent_id in local)
+        return copied, removed
+
+    def create(self, name, content):
+        created = self.source.create(name, content)
+        local = self.put(created['id'], created['name'], content, created.get('modifiedTime'))
+        return {'id': created['id'], 'name': created['name'], 'modifiedTime': local['modifiedTime']}
+
+    def update(self, agent_id, content, name=None):
+        updated = self.source.update(agent_id, content, name=name)
+        return self.put(agent_id, updated['name'], content, updated.get('modifiedTime'))
+
+    def url(self, agent_id):
+        return self.source.url(agent_id)
+
+    def apply_change(self, file):
+        """Copy the edited doc down, returns its local listing entry"""
+        return self.put(file['id'], file['name'], self.source.content(file['id']), file.get('modifiedTime'))
+
+    def apply_remove(self, agent_id):
+        self.remove(agent_id)
@@ -0,0 +1,158 @@
+# agent_cache.py
+"""
+In-memory agent caches for AI Agent Manager
+Keeps extracted agent prompts keyed by Google Doc ID and Drive revision,
+plus an index of the agent folder listing
+"""
+
+import threading
+from collections import OrderedDict
+
+def revision_of(file_metadata):
+    """Build a revision marker from Drive file metadata"""
+    # Google Docs don't always carry headRevisionId, modifiedTime always changes on edit
+    return f"{file_metadata.get('modifiedTime', '')}:{file_metadata.get('headRevisionId', '')}"
+
+class PromptCache:
+    """Bounded LRU cache of extracted agent prompts"""
+
+    def __init__(self, max_entries=128):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, agent_id, revision):
+        """Return cached prompt if it matches revision, otherwise None"""
+        with self._lock:
+            entry = self._entries.get(agent_id)
+            if entry is None or entry['revision'] != revision:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(agent_id)
+            self.hits += 1
+            return entry['prompt']
+
+    def get_entry(self, agent_id):
+        """Return cached entry without revision check (caller trusts it is current)"""
+        with self._lock:
+            entry = self._entries.get(agent_id)
+            if entry is None:
+                # Not a miss yet - the cold load that follows counts it
+                return None
+
+            self._entries.move_to_end(agent_id)
+            self.hits += 1
+            return dict(entry)
+
+    def peek(self, agent_id):
+        """Return cached entry, if any (does not touch counters or recency)"""
+        with self._lock:
+            entry = self._entries.get(agent_id)
+            return dict(entry) if entry is not None else None
+
+    def record_miss(self):
+        """Count a miss for a load that bypassed lookup (cold load)"""
+        with self._lock:
+            self.misses += 1
+
+    def has_revision(self, agent_id, revision):
+        """True if agent is cached at this revision (does not touch counters)"""
+        with self._lock:
+            entry = self._entries.get(agent_id)
+            return entry is not None and entry['revision'] == revision
+
+    def contains(self, agent_id):
+        """True if agent has a cached prompt (does not touch counters)"""
+        with self._lock:
+            return agent_id in self._entries
+
+    def put(self, agent_id, revision, prompt, name=None, modified=None):
+        """Store prompt for agent at the given revision"""
+        if self.max_entries <= 0:
+            return
+
+        with self._lock:
+            self._entries[agent_id] = {
+                'revision': revision,
+                'prompt': prompt,
+                'name': name,
+                'modified': modified
+            }
+            self._entries.move_to_end(agent_id)
+            self._evict()
+
+    def invalidate(self, agent_id):
+        """Drop cached prompt for agent"""
+        with self._lock:
+            self._entries.pop(agent_id, None)
+
+    def resize(self, max_entries):
+        """Change cache capacity, evicting oldest entries if needed"""
+        with self._lock:
+            self.max_entries = max_entries
+            self._evict()
+
+    def stats(self):
+        """Return cache counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0
+            }
+
+    def _evict(self):
+        """Evict least recently used entries above capacity (lock held)"""
+        while len(self._entries) > max(self.max_entries, 0):
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+class AgentIndex:
+    """In-memory listing of the agent folder, kept current by the changes watcher"""
+
+    def __init__(self):
+        self.primed = False
+        self.version = 0
+        self._agents = {}
+        self._lock = threading.Lock()
+
+    def replace(self, agents):
+        """Replace the whole listing with a fresh folder query result"""
+        with self._lock:
+            self._agents = {agent['id']: dict(agent) for agent in agents}
+            self.primed = True
+            self.version += 1
+
+    def upsert(self, agent):
+        """Add or update a single agent"""
+        with self._lock:
+            self._agents[agent['id']] = dict(agent)
+            self.version += 1
+
+    def remove(self, agent_id):
+        """Remove an agent, returns True if it was listed"""
+        with self._lock:
+            if self._agents.pop(agent_id, None) is None:
+                return False
+            self.version += 1
+            return True
+
+    def get(self, agent_id):
+        """Return listed agent or None"""
+        with self._lock:
+            agent = self._agents.get(agent_id)
+            return dict(agent) if agent else None
+
+    def list(self):
+        """Return agents ordered by name (same order as the Drive query)"""
+        with self._lock:
+            agents = [dict(agent) for agent in self._agents.values()]
+        return sorted(agents, key=lambda agent: agent['name'])
@@ -6,6 +6,11 @@ Provides REST API for ChatGPT to access Google Drive agents
 
 import sys
 import io
+import time
+
+# Startup phase timings (ms), reported in the log and by /health
+STARTUP_STARTED = time.perf_counter()
+startup_timings = {}
 
 # Configure stdout/stderr for UTF-8 on Windows (Python 3.14 compatibility)
 if sys.platform == 'win32':
@@ -13,80 +18,111 @@ if sys.platform == 'win32':
         sys.stdout.reconfigure(encoding='utf-8', errors='replace')
         sys.stderr.reconfigure(encoding='utf-8', errors='replace')
 
-from flask import Flask, jsonify, request
+from flask import Flask, Response, g, jsonify, request, stream_with_context
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
+from google.auth.exceptions import TransportError
 from googleapiclient.errors import HttpError
-from pyngrok import ngrok
+import httplib2
 import json
 import os
-import logging
-from logging.handlers import RotatingFileHandler
 from datetime import datetime
 import threading
-import time
 import secrets
-import yaml
+import hashlib
 import re
 import html
-import win32crypt
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Import version info
 from version import VERSION, APP_NAME
+from agent_cache import PromptCache, AgentIndex, revision_of
+from drive_watcher import DriveChangesWatcher
+from google_clients import build_services
+from agent_backends import (STORAGE_DEFAULTS, BACKENDS, MAX_PAGE_SIZE, EXTRACTION_ENGINES, EXPORT_MIME_TYPES,
+                            AgentBackend, AgentNotFound, DriveBackend, LocalBackend, MirrorBackend)
+from credential_manager import CredentialManager
+from resilience import CircuitOpenError, parse_retry_after
+from agent_store import AgentStore
+from health_probe import HealthProber
+from http_cache import BodyCache, EncodedBody, encoded_response
+import rate_limit_store  # registers the sqlite:// limiter storage
+import google_async
+import metrics
+import tracing
+from logging_setup import setup_logging, trace_logger
+
+# pyngrok, yaml and win32crypt are imported where used - none are needed to serve requests
+startup_timings['imports'] = round((time.perf_counter() - STARTUP_STARTED) * 1000, 1)
 
 # Initialize Flask app
 app = Flask(__name__)
 
+# In-memory until initialize_services() applies the configured shared storage
+app.config['RATELIMIT_STORAGE_URI'] = 'memory://'
+
+def rate_limit_key():
+    """Rate limit bucket: the API key for authenticated calls, else the client address"""
+    # Behind ngrok every client shares the edge IP, so the address alone says little
+    if config and config.get('rate_limit_key', 'api_key') == 'api_key' and validate_api_key():
+        return 'api-key:' + hashlib.sha256(api_key.encode('utf-8')).hexdigest()[:16]
+    return get_remote_address()
+
 # Initialize rate limiter
 limiter = Limiter(
     app=app,
-    key_func=get_remote_address,
-    default_limits=["200 per hour"],
-    storage_uri="memory://"
+    key_func=rate_limit_key,
+    default_limits=["200 per hour"]
 )
 
-# Global services
+# Production server defaults, overridden by the "server" section of config.json
+SERVER_DEFAULTS = {
+    'mode': 'waitress',
+    'host': '0.0.0.0',
+    'port': 3000,
+    'workers': 2,
+    'threads': 8,
+    'connection_limit': 100,
+    'backlog': 1024,
+    'request_timeout': 120,
+    'keepalive': 5
+}
+SERVER_MODES = ('waitress', 'gunicorn', 'development')
+
+# Most agents one POST /agents/batch call may load
+MAX_BATCH_SIZE = 25
+
+# Google responses that mean "try later" rather than "agent missing"
+GOOGLE_UNAVAILABLE_STATUSES = (429, 500, 502, 503, 504)
+
+# Caller-supplied request IDs are echoed into logs - only accept plain tokens
+REQUEST_ID_PATTERN = re.compile(r'[A-Za-z0-9._-]{1,64}')
+
+# Global services (thread-safe - each thread executes on its own pooled transport)
 drive_service = None
 docs_service = None
+transport_pool = None
+credential_manager = None
 config = None
+
+# Where agents are read from and written to (Drive, local directory, or local mirror of Drive)
+agent_backend = None
 ngrok_url = None
 api_key = None
 
-# Setup logging
-def setup_logging():
-    """Configure logging to file and console"""
-    log_formatter = logging.Formatter(
-        '%(asctime)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-
-    # File handler with rotation
-    file_handler = RotatingFileHandler(
-        'agent-server.log',
-        maxBytes=1024*1024,  # 1MB
-        backupCount=3
-    )
-    file_handler.setFormatter(log_formatter)
-    file_handler.setLevel(logging.INFO)
-
-    # Console handler with UTF-8 encoding for Windows compatibility
-    console_handler = logging.StreamHandler()
-    # Configure stream to use UTF-8 and replace unmappable characters
-    if hasattr(console_handler.stream, 'reconfigure'):
-        console_handler.stream.reconfigure(encoding='utf-8', errors='replace')
-    console_handler.setFormatter(log_formatter)
-    console_handler.setLevel(logging.INFO)
-
-    # Configure root logger
-    logger = logging.getLogger()
-    logger.setLevel(logging.INFO)
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+# Extracted prompts, validated against Drive revision unless the changes watcher is current
+prompt_cache = PromptCache()
+agent_index = AgentIndex()
+agent_store = None
+changes_watcher = None
 
-    return logger
+# Serialized (and compressed) response bodies per agent revision / listing version
+response_cache = BodyCache()
+config_lock = threading.Lock()
 
+# Defaults until config.json is loaded
 logger = setup_logging()
 
 def generate_api_key():
@@ -111,8 +147,7 @@ def load_or_create_api_key():
     if config:
         config['api_key'] = api_key
         try:
-            with open('config.json', 'w', encoding='utf-8') as f:
-                json.dump(config, f, indent=2)
+            save_config()
             logger.info("✅ API key saved to config.json")
         except Exception as e:
             logger.error(f"Failed to save API key: {e}")
@@ -132,6 +167,47 @@ def validate_api_key():
     token = parts[1]
     return token == api_key
 
+@app.before_request
+def start_request_timer():
+    """Note request start for the latency histogram and open the request trace"""
+    g.request_started = time.perf_counter()
+
+    # Honour a caller-supplied ID so traces can be matched across systems
+    trace_id = request.headers.get('X-Request-ID', '')
+    g.trace = tracing.Trace(trace_id if REQUEST_ID_PATTERN.fullmatch(trace_id) else None)
+    g.trace_token = tracing.current_trace.set(g.trace)
+
+@app.after_request
+def record_request_metrics(response):
+    """Count the request, observe its latency per route and report its trace"""
+    route = request.endpoint or 'unmatched'
+    metrics.http_requests.inc(route=route, method=request.method, status=str(response.status_code))
+
+    started = g.get('request_started')
+    if started is not None:
+        metrics.http_latency.observe(time.perf_counter() - started, route=route)
+
+    trace = g.get('trace')
+    if trace is not None:
+        response.headers['Server-Timing'] = trace.server_timing()
+        response.headers['X-Request-ID'] = trace.trace_id
+        if config and config.get('trace_log'):
+            write_trace(trace, route, response.status_code)
+    return response
+
+@app.teardown_request
+def end_request_trace(exc):
+    """Detach the request trace from this thread"""
+    token = g.pop('trace_token', None)
+    if token is not None:
+        tracing.current_trace.reset(token)
+
+def write_trace(trace, route, status):
+    """Queue one request's spans for the JSON trace log (written by the logging thread)"""
+    entry = trace.to_dict()
+    entry.update({'route': route, 'status': status, 'time': datetime.now().isoformat(timespec='seconds')})
+    trace_logger.info(json.dumps(entry))
+
 @app.before_request
 def check_authentication():
     """Check API key before processing requests"""
@@ -158,9 +234,21 @@ def load_config():
         logger.error(f"Invalid config.json: {e}")
         return None
 
+def save_config():
+    """Write current configuration back to config.json"""
+    with config_lock:
+        # Write then rename so other worker processes never read a half-written file;
+        # the temp name is per-writer so two processes saving at once can't collide
+        tmp_path = f"config.json.{secrets.token_hex(4)}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(config, f, indent=2)
+        os.replace(tmp_path, 'config.json')
+
 def decrypt_credentials(encrypted_data):
     """Decrypt credentials using Windows DPAPI"""
     try:
+        import win32crypt
+
         # CryptUnprotectData returns (description, decrypted_bytes) tuple
         description, decrypted_bytes = win32crypt.CryptUnprotectData(encrypted_data, None, None, None, 0)
         return decrypted_bytes.decode('utf-8')
@@ -202,6 +290,26 @@ def load_credentials():
         logger.error(f"Failed to load credentials: {e}")
         return None
 
+def save_credentials(creds):
+    """Persist refreshed credentials to whichever file load_credentials() reads"""
+    creds_json = creds.to_json()
+
+    if os.path.exists('credentials.json.encrypted'):
+        import win32crypt
+
+        path = 'credentials.json.encrypted'
+        data = win32crypt.CryptProtectData(creds_json.encode('utf-8'), "AI Agent Manager", None, None, None, 0)
+    else:
+        path = 'credentials.json'
+        data = creds_json.encode('utf-8')
+
+    # Write then rename so a crash mid-write never leaves a corrupt token file;
+    # workers refreshing at once each get their own temp name
+    tmp_path = f"{path}.{secrets.token_hex(4)}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
 def validate_agent_name(name):
     """Validate agent name"""
     if not name or not isinstance(name, str):
@@ -220,16 +328,31 @@ def validate_agent_name(name):
     return True, None
 
 def validate_agent_id(agent_id):
-    """Validate Google Doc ID format"""
+    """Validate agent ID format for the configured storage backend"""
     if not agent_id or not isinstance(agent_id, str):
         return False, "Agent ID is required"
 
-    # Google Doc IDs are alphanumeric with hyphens and underscores, typically 44 chars
-    if not re.match(r'^[a-zA-Z0-9\-_]{20,100}$', agent_id):
+    # Google Doc IDs are alphanumeric with hyphens and underscores, typically 44 chars;
+    # local agent IDs are file names from the same alphabet
+    id_pattern = agent_backend.id_pattern if agent_backend else AgentBackend.id_pattern
+    if not re.match(id_pattern, agent_id):
         return False, "Invalid agent ID format"
 
     return True, None
 
+def validate_page_params(limit, cursor):
+    """Validate list pagination query parameters"""
+    if limit is not None:
+        if not limit.isdigit() or not 1 <= int(limit) <= MAX_PAGE_SIZE:
+            return False, f"limit must be a number between 1 and {MAX_PAGE_SIZE}"
+
+    if cursor is not None:
+        # Drive page tokens are opaque but URL-safe
+        if not re.match(r'^[a-zA-Z0-9\-_.~+/=]{1,1024}$', cursor):
+            return False, "Invalid cursor format"
+
+    return True, None
+
 def validate_text_length(text, field_name, max_length=51200):
     """Validate text field length (default 50KB)"""
     if text is None:
@@ -253,11 +376,327 @@ def sanitize_text(text):
         return [html.escape(str(item)) for item in text]
     return text
 
+def extraction_engine():
+    """Configured prompt extraction engine"""
+    engine = config.get('extraction_engine', 'docs') if config else 'docs'
+    return engine if engine in EXTRACTION_ENGINES else 'docs'
+
+def export_mime_type():
+    """Configured export format for the export engine"""
+    mime_type = config.get('export_mime_type', 'text/plain') if config else 'text/plain'
+    return mime_type if mime_type in EXPORT_MIME_TYPES else 'text/plain'
+
+def storage_settings():
+    """Configured storage section, with defaults"""
+    settings = {**STORAGE_DEFAULTS, **(config.get('storage') or {})}
+    if settings['backend'] not in BACKENDS:
+        logger.warning(f"Unknown storage backend '{settings['backend']}', using 'drive'")
+        settings['backend'] = 'drive'
+    return settings
+
+def open_agent_backend(settings):
+    """Build the configured storage backend (Google services must already be built if it needs them)"""
+    if settings['backend'] == 'local' and not settings['mirror_from_drive']:
+        return LocalBackend(settings['directory'])
+
+    if not config.get('agent_folder_id'):
+        logger.error("Agent folder not configured - run init_drive.py")
+        return None
+
+    drive = DriveBackend(
+        drive_service,
+        docs_service,
+        config.get('agent_folder_id'),
+        engine=extraction_engine(),
+        export_mime_type=export_mime_type(),
+        field_mask=config.get('docs_field_mask', True)
+    )
+    if settings['backend'] == 'local':
+        return MirrorBackend(settings['directory'], drive)
+    return drive
+
+def list_agent_page_shared(page_size=MAX_PAGE_SIZE, page_token=None):
+    """One page of the backend's agent listing, with identical concurrent queries sharing one call"""
+    key = ('listing', agent_backend.name, page_size, page_token)
+    return google_async.run(google_async.single_flight(
+        key,
+        lambda: google_async.call(agent_backend.list_page, page_size, page_token)
+    ))
+
+def agent_summary(file):
+    """Build the listing entry for a Drive file"""
+    return {
+        'id': file['id'],
+        'name': file['name'],
+        'modified': file.get('modifiedTime')
+    }
+
+def open_agent_store():
+    """Open the local agent store and load it into the in-memory caches"""
+    global agent_store
+
+    path = config.get('agent_store_path', 'agent-store.db')
+    if not path:
+        agent_store = None
+        return
+
+    agent_store = AgentStore(path)
+
+    # The watcher trusts cached entries without asking Drive, which is only safe if it
+    # replays every change made while we were down (i.e. it has a saved page token)
+    if config.get('watch_changes', True) and not config.get('changes_page_token'):
+        logger.info(f"Local agent store opened ({path}), used as outage fallback until the watcher is running")
+        return
+
+    stored = agent_store.load_agents()
+    for agent in stored:
+        prompt_cache.put(agent['id'], agent['revision'], agent['prompt'], agent['name'], agent['modified'])
+
+    listing = agent_store.load_listing()
+    if listing:
+        agent_index.replace(listing)
+
+    logger.info(f"✅ Loaded {len(stored)} agents from local store ({path})")
+
+def remember_agent(agent_id, revision, prompt, name, modified):
+    """Cache a freshly fetched agent and write it through to the local store"""
+    prompt_cache.put(agent_id, revision, prompt, name, modified)
+    if agent_store:
+        try:
+            agent_store.save_agent(agent_id, revision, prompt, name, modified)
+        except Exception as e:
+            logger.warning(f"Failed to write agent store: {e}")
+
+def remember_listing(agents):
+    """Replace the cached folder listing and write it through to the local store"""
+    agent_index.replace(agents)
+    if agent_store:
+        try:
+            agent_store.save_listing(agents)
+        except Exception as e:
+            logger.warning(f"Failed to write agent store: {e}")
+
+def remember_listed_agent(agent):
+    """Add or update one agent in the cached folder listing"""
+    agent_index.upsert(agent)
+    if agent_store:
+        try:
+            agent_store.upsert_listing(agent)
+        except Exception as e:
+            logger.warning(f"Failed to write agent store: {e}")
+
+def last_known_agent(agent_id):
+    """Last good copy of an agent from memory or the local store, or None"""
+    cached = prompt_cache.peek(agent_id)
+    if cached:
+        return cached
+    return agent_store.get_agent(agent_id) if agent_store else None
+
+def last_known_listing():
+    """Last good folder listing from memory or the local store, or None"""
+    if agent_index.primed:
+        return agent_index.list()
+    if agent_store:
+        return agent_store.load_listing() or None
+    return None
+
+def is_google_unavailable(error):
+    """True if an error means Google couldn't be reached, not that the agent is missing"""
+    if isinstance(error, AgentNotFound):
+        return False
+    if isinstance(error, HttpError):
+        return error.resp.status in GOOGLE_UNAVAILABLE_STATUSES
+    return isinstance(error, (CircuitOpenError, OSError, httplib2.HttpLib2Error, TransportError))
+
+def google_error_status(error):
+    """Map a failed agent load to (HTTP status, client message)"""
+    if isinstance(error, AgentNotFound):
+        return 404, 'Agent not found'
+    if is_google_unavailable(error):
+        return 503, 'Google API temporarily unavailable - try again shortly'
+    if isinstance(error, HttpError):
+        if error.resp.status == 404:
+            return 404, 'Agent not found'
+        if error.resp.status in (401, 403):
+            return 403, 'Access to agent denied'
+        return 502, 'Google API request failed'
+    return 500, str(error)
+
+def google_unavailable_response(error):
+    """503 response telling the client when to retry"""
+    if isinstance(error, CircuitOpenError):
+        retry_after = error.retry_in
+    elif isinstance(error, HttpError):
+        retry_after = parse_retry_after(error.resp.get('retry-after'))
+    else:
+        retry_after = None
+
+    response = jsonify({'error': 'Google API temporarily unavailable - try again shortly'})
+    response.status_code = 503
+    response.headers['Retry-After'] = str(max(1, round(retry_after if retry_after is not None else 30)))
+    return response
+
+def warm_cache(max_workers=8, top_n=0):
+    """Fetch agent prompts concurrently so the first requests are served from memory"""
+    start = time.perf_counter()
+    if agent_backend is None:
+        return
+
+    files = agent_backend.list_all()
+    remember_listing([agent_summary(file) for file in files])
+
+    # Most used agents first (from the local store); fall back to folder order
+    if top_n:
+        by_id = {file['id']: file for file in files}
+        ranked = [by_id[agent_id] for agent_id in agent_store.top_agents(top_n) if agent_id in by_id] if agent_store else []
+        ranked_ids = {file['id'] for file in ranked}
+        files = (ranked + [file for file in files if file['id'] not in ranked_ids])[:top_n]
+
+    # No point fetching more than the cache can hold
+    files = files[:max(prompt_cache.max_entries, 0)]
+
+    # Skip agents already cached at their current revision (e.g. from the local store)
+    pending = [file for file in files if not prompt_cache.has_revision(file['id'], revision_of(file))]
+    current = len(files) - len(pending)
+
+    def warm_one(file):
+        prompt = agent_backend.content(file['id'])
+        remember_agent(file['id'], revision_of(file), prompt, file['name'], file.get('modifiedTime'))
+
+    loaded = 0
+    failed = 0
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='warmup') as pool:
+        futures = {pool.submit(warm_one, file): file for file in pending}
+        for future in as_completed(futures):
+            try:
+                future.result()
+                loaded += 1
+            except Exception as e:
+                failed += 1
+                logger.warning(f"Warm-up failed for {futures[future]['name']}: {e}")
+
+    elapsed = time.perf_counter() - start
+    logger.info(f"🔥 Cache warm-up: loaded {loaded} agents, {current} already current, "
+                f"{failed} failed in {elapsed:.2f}s ({max_workers} workers)")
+
+def start_warmup():
+    """Run the configured cache warm-up, inline or in the background"""
+    settings = config.get('warmup', {})
+    if not settings.get('enabled', True):
+        return
+
+    def run():
+        try:
+            warm_cache(
+                max_workers=settings.get('max_workers', 8),
+                top_n=settings.get('top_n', 0)
+            )
+        except Exception as e:
+            logger.warning(f"Cache warm-up failed: {e}")
+
+    if settings.get('blocking', False):
+        run()
+    else:
+        threading.Thread(target=run, name='cache-warmup', daemon=True).start()
+
+def handle_agent_changed(file):
+    """Apply an edit or addition reported by the changes watcher"""
+    # A local mirror copies the doc down first; cache entries follow the local copy
+    file = agent_backend.apply_change(file)
+    agent_id = file['id']
+    remember_listed_agent(agent_summary(file))
+
+    revision = revision_of(file)
+    if not prompt_cache.contains(agent_id) or prompt_cache.has_revision(agent_id, revision):
+        return
+
+    if config.get('changes_prefetch', True):
+        # Agent is hot - re-fetch now so the next read is served from memory
+        try:
+            prompt = agent_backend.content(agent_id)
+        except Exception:
+            # The watcher vouches for cached entries, so the pre-edit prompt must not stay
+            forget_prompt(agent_id)
+            raise
+        remember_agent(agent_id, revision, prompt, file['name'], file.get('modifiedTime'))
+        logger.info(f"Refreshed cached agent: {file['name']}")
+    else:
+        forget_prompt(agent_id)
+        logger.info(f"Evicted cached agent: {file['name']}")
+
+def forget_prompt(agent_id):
+    """Drop an edited agent's old prompt from memory and the local store"""
+    prompt_cache.invalidate(agent_id)
+    if agent_store:
+        try:
+            agent_store.remove_prompt(agent_id)
+        except Exception as e:
+            logger.warning(f"Failed to write agent store: {e}")
+
+def handle_agent_removed(agent_id):
+    """Apply a trash, delete or move-out reported by the changes watcher"""
+    agent_backend.apply_remove(agent_id)
+
+    # Removals arrive for every file in the user's Drive - skip IDs we hold nothing for
+    in_memory = agent_index.get(agent_id) is not None or prompt_cache.contains(agent_id)
+    if not in_memory and not (agent_store and agent_store.has_agent(agent_id)):
+        return
+
+    prompt_cache.invalidate(agent_id)
+    if agent_store:
+        agent_store.remove_agent(agent_id)
+    if agent_index.remove(agent_id):
+        logger.info(f"Agent removed from folder: {agent_id}")
+
+def save_changes_token(token):
+    """Persist the Drive changes page token so restarts resume where we left off"""
+    config['changes_page_token'] = token
+    try:
+        save_config()
+    except Exception as e:
+        logger.error(f"Failed to save changes page token: {e}")
+
+def start_changes_watcher():
+    """Start the background Drive changes watcher"""
+    global changes_watcher
+
+    folder_id = config.get('agent_folder_id')
+    if drive_service is None or not folder_id or not config.get('watch_changes', True):
+        return
+
+    changes_watcher = DriveChangesWatcher(
+        drive_service,
+        folder_id,
+        on_change=handle_agent_changed,
+        on_remove=handle_agent_removed,
+        interval=config.get('changes_poll_interval', 15),
+        page_token=config.get('changes_page_token'),
+        on_token=save_changes_token
+    )
+    changes_watcher.start()
+
+def watcher_is_current():
+    """True if local caches can be trusted without asking Drive"""
+    return changes_watcher is not None and changes_watcher.is_current()
+
+def configure_rate_limits():
+    """Point the limiter at the configured storage (re-initializing it in place)"""
+    storage_uri = config.get('rate_limit_storage', 'sqlite:///rate-limits.db')
+    app.config['RATELIMIT_STORAGE_URI'] = storage_uri
+    try:
+        limiter.init_app(app)
+        logger.info(f"Rate limits: {storage_uri}, keyed by {config.get('rate_limit_key', 'api_key')}")
+    except Exception as e:
+        logger.warning(f"Rate limit storage {storage_uri} unavailable, using memory: {e}")
+        app.config['RATELIMIT_STORAGE_URI'] = 'memory://'
+        limiter.init_app(app)
+
 def initialize_services():
     """Initialize Google API services"""
-    global drive_service, docs_service, config
+    global drive_service, docs_service, transport_pool, credential_manager, config, agent_backend
 
     logger.info("Initializing services...")
+    phase = time.perf_counter()
 
     # Load config
     config = load_config()
@@ -265,24 +704,148 @@ def initialize_services():
         logger.error("Failed to load config")
         return False
 
+    # Apply log file size, format and sampling settings
+    setup_logging(config.get('logging'), trace_log=config.get('trace_log'))
+
     # Load or generate API key
     load_or_create_api_key()
 
+    # Shared rate limit storage so every worker process enforces one budget
+    configure_rate_limits()
+    phase = mark_startup_phase('config', phase)
+
+    # Local copy of agents for cold starts and Google outages
+    try:
+        open_agent_store()
+    except Exception as e:
+        logger.warning(f"Local agent store unavailable: {e}")
+    phase = mark_startup_phase('agent_store', phase)
+
+    # Worker pool for concurrent Google calls
+    google_async.configure(config.get('google_async_workers', 16))
+
+    # Size prompt cache (0 disables caching)
+    prompt_cache.resize(config.get('prompt_cache_size', 128))
+
+    storage = storage_settings()
+    if storage['backend'] == 'local' and not storage['mirror_from_drive']:
+        # Agents served straight from disk - no Google account needed
+        agent_backend = open_agent_backend(storage)
+        logger.info(f"Agent storage: local directory {agent_backend.directory}")
+        return start_background_services(phase)
+
+    if config.get('extraction_engine', 'docs') not in EXTRACTION_ENGINES:
+        logger.warning(f"Unknown extraction_engine '{config['extraction_engine']}', using 'docs'")
+    logger.info(f"Prompt extraction engine: {extraction_engine()}")
+
     # Load credentials
     creds = load_credentials()
     if not creds:
         logger.error("Failed to load credentials")
         return False
 
-    # Build services
+    # One credentials owner for every service - refreshes ahead of expiry in the background
+    if credential_manager:
+        credential_manager.stop()
+    credential_manager = CredentialManager(
+        creds,
+        on_refresh=save_credentials,
+        refresh_margin=config.get('token_refresh_margin', 300),
+        timeout=config.get('google_http_timeout', 60)
+    )
+    credential_manager.start()
+    phase = mark_startup_phase('credentials', phase)
+
+    # Build services (from trimmed, cached discovery docs unless configured otherwise)
     try:
-        drive_service = build('drive', 'v3', credentials=creds)
-        docs_service = build('docs', 'v1', credentials=creds)
+        drive_service, docs_service, transport_pool = build_services(
+            creds,
+            timeout=config.get('google_http_timeout', 60),
+            retry=config.get('google_retries'),
+            credential_manager=credential_manager,
+            discovery=config.get('discovery', 'trimmed'),
+            api_root=config.get('google_api_root')
+        )
         logger.info("✅ Google API services initialized")
-        return True
     except Exception as e:
         logger.error(f"Failed to initialize services: {e}")
         return False
+    phase = mark_startup_phase('google_services', phase)
+
+    agent_backend = open_agent_backend(storage)
+    if isinstance(agent_backend, MirrorBackend):
+        logger.info(f"Agent storage: local directory {agent_backend.directory}, mirrored from Drive")
+        start_mirror_sync()
+    elif agent_backend:
+        logger.info("Agent storage: Google Drive")
+
+    return start_background_services(phase)
+
+def start_mirror_sync():
+    """Bring the local mirror up to date - inline on first run, in the background after that"""
+    def run():
+        try:
+            started = time.perf_counter()
+            copied, removed = agent_backend.sync()
+            logger.info(f"🪞 Mirror sync: {copied} agents copied, {removed} removed "
+                        f"in {time.perf_counter() - started:.2f}s")
+        except Exception as e:
+            logger.warning(f"Mirror sync failed, serving the existing local copy: {e}")
+
+    # An empty mirror would answer 404 for every agent until the first sync lands
+    if agent_backend.list_page(page_size=1)[0]:
+        threading.Thread(target=run, name='mirror-sync', daemon=True).start()
+    else:
+        run()
+
+def start_background_services(phase):
+    """Start the changes watcher, cache warm-up and health prober"""
+    # Watch the agent folder for edits (non-fatal if it can't start)
+    try:
+        start_changes_watcher()
+    except Exception as e:
+        logger.warning(f"Drive changes watcher not started: {e}")
+
+    # Pre-load agent prompts before (or while) traffic arrives
+    start_warmup()
+
+    # Keep /health answers local - dependencies are checked in the background
+    health_prober.interval = config.get('health_probe_interval', 60)
+    health_prober.start()
+    mark_startup_phase('background', phase)
+
+    timings = ', '.join(f"{name} {ms} ms" for name, ms in startup_timings.items())
+    logger.info(f"⏱️ Startup: {timings}")
+    return True
+
+def mark_startup_phase(name, started):
+    """Record a startup phase's duration, returns the start of the next phase"""
+    now = time.perf_counter()
+    startup_timings[name] = round((now - started) * 1000, 1)
+    return now
+
+def probe_drive():
+    """Health probe: cheapest authenticated Drive call"""
+    if drive_service is None:
+        # Local storage without a Drive mirror
+        return 'not configured'
+    drive_service.about().get(fields='user').execute()
+    return 'connected'
+
+def probe_tunnel():
+    """Health probe: ngrok is running and still has our tunnel"""
+    if not ngrok_url:
+        return 'not started'
+
+    from pyngrok import conf, ngrok, process
+    # get_tunnels() would launch ngrok if it had died - check the process first
+    if not process.is_process_running(conf.get_default().ngrok_path):
+        raise RuntimeError('ngrok process is not running')
+    if not any(tunnel.public_url == ngrok_url for tunnel in ngrok.get_tunnels()):
+        raise RuntimeError(f'tunnel {ngrok_url} is gone')
+    return 'connected'
+
+health_prober = HealthProber({'google_drive': probe_drive, 'ngrok': probe_tunnel})
 
 def start_ngrok():
     """Start ngrok tunnel"""
@@ -292,13 +855,15 @@ def start_ngrok():
         logger.info("Starting ngrok tunnel...")
 
         # Load authtoken from ngrok.yml if not already configured
-        from pyngrok import conf
+        from pyngrok import conf, ngrok
         config_obj = conf.get_default()
 
         if not config_obj.auth_token:
             ngrok_config_path = os.path.expanduser('~/.ngrok2/ngrok.yml')
 
             if os.path.exists(ngrok_config_path):
+                import yaml
+
                 try:
                     with open(ngrok_config_path, 'r', encoding='utf-8') as f:
                         ngrok_config = yaml.safe_load(f)
@@ -329,7 +894,7 @@ def start_ngrok():
                 return False
 
         # Start tunnel
-        tunnel = ngrok.connect(3000, bind_tls=True)
+        tunnel = ngrok.connect(server_settings()['port'], bind_tls=True)
         ngrok_url = tunnel.public_url
 
         logger.info(f"✅ Ngrok tunnel started: {ngrok_url}")
@@ -337,8 +902,7 @@ def start_ngrok():
         # Save URL to config
         if config:
             config['ngrok_url'] = ngrok_url
-            with open('config.json', 'w', encoding='utf-8') as f:
-                json.dump(config, f, indent=2)
+            save_config()
 
         # Write URL and API key to file for easy copying
         with open('GPT-CONFIG.txt', 'w', encoding='utf-8') as f:
@@ -379,20 +943,25 @@ def health_check():
         is_authenticated = validate_api_key() if auth_header else False
 
         if is_authenticated:
-            # Full details for authenticated requests
-            drive_status = 'connected'
-            try:
-                drive_service.about().get(fields='user').execute()
-            except:
-                drive_status = 'disconnected'
+            # Full details for authenticated requests, from the background prober
+            # unless ?deep=1 asks for a live check
+            if request.args.get('deep') in ('1', 'true'):
+                health_prober.probe()
+            probes = health_prober.snapshot()
 
             return jsonify({
                 'status': 'healthy',
                 'version': VERSION,
                 'app_name': APP_NAME,
-                'google_drive': drive_status,
+                'google_drive': probes['google_drive']['status'],
+                'probes': probes,
                 'agent_folder': config.get('agent_folder_name', 'Unknown'),
+                'storage': agent_backend.name if agent_backend else None,
                 'ngrok_url': ngrok_url,
+                'prompt_cache': prompt_cache.stats(),
+                'google_transports': transport_pool.stats() if transport_pool else None,
+                'startup_ms': startup_timings,
+                'changes_watcher': 'current' if watcher_is_current() else 'inactive',
                 'authenticated': True
             })
         else:
@@ -409,6 +978,12 @@ def health_check():
         logger.error(f"Health check failed: {e}")
         return jsonify({'status': 'unhealthy', 'error': str(e)}), 500
 
+@app.route('/metrics', methods=['GET'])
+@limiter.exempt
+def metrics_endpoint():
+    """Request and Google API metrics in Prometheus text format"""
+    return Response(metrics.registry.render(), mimetype='text/plain; version=0.0.4')
+
 @app.route('/agents', methods=['GET'])
 @limiter.limit("100 per hour")
 def list_agents():
@@ -416,40 +991,188 @@ def list_agents():
     try:
         logger.info("Listing agents...")
 
-        folder_id = config.get('agent_folder_id')
-        if not folder_id:
-            return jsonify({'error': 'Agent folder not configured'}), 500
-
-        # Query for all docs in agents folder
-        query = f"'{folder_id}' in parents and mimeType='application/vnd.google-apps.document' and trashed=false"
-
-        results = drive_service.files().list(
-            q=query,
-            fields='files(id, name, modifiedTime)',
-            orderBy='name'
-        ).execute()
-
-        files = results.get('files', [])
+        if agent_backend is None:
+            return jsonify({'error': 'Agent storage not configured'}), 500
+
+        # Client-driven paging: one Drive page per request
+        limit = request.args.get('limit')
+        cursor = request.args.get('cursor')
+        if limit is not None or cursor is not None:
+            is_valid, error_msg = validate_page_params(limit, cursor)
+            if not is_valid:
+                return jsonify({'error': error_msg}), 400
+
+            files, next_cursor = list_agent_page_shared(
+                page_size=int(limit) if limit else MAX_PAGE_SIZE,
+                page_token=cursor
+            )
+            agents = [agent_summary(file) for file in files]
+
+            logger.info(f"Found {len(agents)} agents (page)")
+
+            return encoded_response(EncodedBody({
+                'agents': agents,
+                'count': len(agents),
+                'next_cursor': next_cursor
+            }))
+
+        # Serve from the watched index when it is known to be current
+        if agent_index.primed and watcher_is_current():
+            body = response_cache.get_or_build(('listing', agent_index.version), listing_response)
+            logger.info("Found agents (cached)")
+            return encoded_response(body)
+
+        # Full listing: fetch the first page up front so Google errors still return a 500
+        try:
+            files, next_token = list_agent_page_shared()
+        except Exception as e:
+            listing = last_known_listing() if is_google_unavailable(e) else None
+            if listing is None:
+                raise
+
+            logger.warning(f"Google unreachable, serving last known listing: {e}")
+            return encoded_response(EncodedBody({
+                'agents': listing,
+                'count': len(listing),
+                'stale': True
+            }))
+        agents = [agent_summary(file) for file in files]
+
+        if not next_token:
+            remember_listing(agents)
+            logger.info(f"Found {len(agents)} agents")
+
+            return encoded_response(EncodedBody({
+                'agents': agents,
+                'count': len(agents)
+            }))
+
+        # More pages - stream the array instead of building the whole response in memory
+        return Response(
+            stream_with_context(stream_agent_listing(agents, next_token)),
+            mimetype='application/json'
+        )
 
-        agents = [{
-            'id': file['id'],
-            'name': file['name'],
-            'modified': file.get('modifiedTime')
-        } for file in files]
+    except Exception as e:
+        if is_google_unavailable(e):
+            logger.warning(f"Google unavailable listing agents: {e}")
+            return google_unavailable_response(e)
+        if isinstance(e, HttpError):
+            logger.error(f"Google API error: {e}")
+            return jsonify({'error': 'Failed to list agents', 'details': str(e)}), 500
+        logger.error(f"Error listing agents: {e}")
+        return jsonify({'error': str(e)}), 500
 
-        logger.info(f"Found {len(agents)} agents")
+def listing_response():
+    """Build the GET /agents response body from the cached folder index"""
+    agents = agent_index.list()
+    return {
+        'agents': agents,
+        'count': len(agents)
+    }
+
+def stream_agent_listing(first_page, next_token):
+    """Yield the agent listing JSON page by page"""
+    # Hold the whole folder only if the index can't be kept current by the changes watcher
+    listed = [] if not agent_index.primed or changes_watcher is None else None
+    count = 0
+
+    yield '{"agents": ['
+
+    page = first_page
+    while True:
+        for agent in page:
+            yield (', ' if count else '') + json.dumps(agent)
+            count += 1
+        if listed is not None:
+            listed.extend(page)
+
+        if not next_token:
+            break
 
-        return jsonify({
-            'agents': agents,
-            'count': len(agents)
-        })
+        try:
+            files, next_token = list_agent_page_shared(page_token=next_token)
+        except Exception as e:
+            # Headers are already sent - end the stream, the client sees truncated JSON
+            logger.error(f"Error streaming agent listing after {count} agents: {e}")
+            return
+        page = [agent_summary(file) for file in files]
+
+    yield f'], "count": {count}}}'
+
+    if listed is not None:
+        remember_listing(listed)
+    logger.info(f"Found {count} agents (streamed)")
+
+def agent_response(agent_id, name, prompt, modified):
+    """Build the GET /agents/<agent_id> response body"""
+    return {
+        'id': agent_id,
+        'name': name,
+        'prompt': prompt,
+        'modified': modified,
+        'length': len(prompt)
+    }
+
+async def fetch_agent(agent_id):
+    """Load an agent's metadata and prompt, returns (agent, revision, served_from_cache)"""
+    # Local store reads and writes go to the worker pool - SQLite must never block the loop
+    if agent_store:
+        await google_async.call(agent_store.record_use, agent_id)
+
+    # Watcher evicts edited agents, so a cached entry is current without asking Drive
+    if watcher_is_current():
+        cached = prompt_cache.get_entry(agent_id)
+        if cached:
+            return agent_response(agent_id, cached['name'], cached['prompt'], cached['modified']), cached['revision'], True
 
-    except HttpError as e:
-        logger.error(f"Google API error: {e}")
-        return jsonify({'error': 'Failed to list agents', 'details': str(e)}), 500
+    try:
+        # Concurrent loads of the same doc share one set of Google calls
+        return await google_async.single_flight(('agent', agent_id), lambda: fetch_agent_from_backend(agent_id))
     except Exception as e:
-        logger.error(f"Error listing agents: {e}")
-        return jsonify({'error': str(e)}), 500
+        if not is_google_unavailable(e):
+            raise
+
+        stored = await google_async.call(last_known_agent, agent_id)
+        if stored is None:
+            raise
+
+        logger.warning(f"Google unreachable, serving last known copy of {stored['name']}: {e}")
+        agent = agent_response(agent_id, stored['name'], stored['prompt'], stored['modified'])
+        agent['stale'] = True
+        return agent, f"{stored['revision']}:stale", True
+
+async def fetch_agent_from_backend(agent_id):
+    """Load an agent from storage, reusing the cached prompt if the revision still matches"""
+    if not prompt_cache.contains(agent_id):
+        # Cold load - nothing to validate, so metadata and content go out together
+        prompt_cache.record_miss()
+        if agent_backend.combined_get:
+            file_metadata, prompt = await google_async.call(agent_backend.get, agent_id)
+        else:
+            file_metadata, prompt = await asyncio.gather(
+                google_async.call(agent_backend.metadata, agent_id),
+                google_async.call(agent_backend.content, agent_id)
+            )
+        revision = revision_of(file_metadata)
+        await google_async.call(remember_agent, agent_id, revision, prompt,
+                                file_metadata['name'], file_metadata.get('modifiedTime'))
+        return agent_response(agent_id, file_metadata['name'], prompt, file_metadata.get('modifiedTime')), revision, False
+
+    # Get metadata (cheap call, used to validate the prompt cache)
+    file_metadata = await google_async.call(agent_backend.metadata, agent_id)
+
+    revision = revision_of(file_metadata)
+    prompt = prompt_cache.get(agent_id, revision)
+    cached = prompt is not None
+
+    if not cached:
+        # Get document content and extract text
+        prompt = await google_async.call(agent_backend.content, agent_id)
+        await google_async.call(remember_agent, agent_id, revision, prompt,
+                                file_metadata['name'], file_metadata.get('modifiedTime'))
+
+    return agent_response(agent_id, file_metadata['name'], prompt, file_metadata.get('modifiedTime')), revision, cached
 
 @app.route('/agents/<agent_id>', methods=['GET'])
 @limiter.limit("100 per hour")
@@ -461,42 +1184,86 @@ def get_agent(agent_id):
         if not is_valid:
             return jsonify({'error': error_msg}), 400
 
+        if agent_backend is None:
+            return jsonify({'error': 'Agent storage not configured'}), 500
+
         logger.info(f"Loading agent: {agent_id}")
 
-        # Get document content
-        doc = docs_service.documents().get(documentId=agent_id).execute()
+        agent, revision, cached = google_async.run(fetch_agent(agent_id))
 
-        # Extract text content
-        content = []
-        for element in doc.get('body', {}).get('content', []):
-            if 'paragraph' in element:
-                for text_run in element['paragraph'].get('elements', []):
-                    if 'textRun' in text_run:
-                        content.append(text_run['textRun']['content'])
+        logger.info(f"Loaded agent: {agent['name']}{' (cached)' if cached else ''}")
 
-        prompt = ''.join(content)
+        # Encoded once per revision - repeat hits skip JSON encoding and compression
+        with tracing.span('encode'):
+            body = response_cache.get_or_build(('agent', agent_id, revision), lambda: agent)
+            return encoded_response(body)
 
-        # Get metadata
-        file_metadata = drive_service.files().get(
-            fileId=agent_id,
-            fields='name, modifiedTime'
-        ).execute()
+    except Exception as e:
+        status, message = google_error_status(e)
+        if status == 503:
+            logger.warning(f"Google unavailable loading agent: {e}")
+            return google_unavailable_response(e)
+        logger.error(f"{'Google API error' if isinstance(e, HttpError) else 'Error loading agent'}: {e}")
+        return jsonify({'error': message}), status
+
+async def fetch_agents(agent_ids):
+    """Load several agents concurrently, returns (agents, errors)"""
+    results = await asyncio.gather(*(fetch_agent(agent_id) for agent_id in agent_ids), return_exceptions=True)
+
+    agents = []
+    errors = []
+    for agent_id, result in zip(agent_ids, results):
+        if isinstance(result, Exception):
+            status, message = google_error_status(result)
+            logger.error(f"Error loading agent {agent_id}: {result}")
+            errors.append({'id': agent_id, 'error': message, 'status': status})
+        else:
+            agents.append(result[0])
 
-        logger.info(f"Loaded agent: {file_metadata['name']}")
+    return agents, errors
 
-        return jsonify({
-            'id': agent_id,
-            'name': file_metadata['name'],
-            'prompt': prompt,
-            'modified': file_metadata.get('modifiedTime'),
-            'length': len(prompt)
-        })
+@app.route('/agents/batch', methods=['POST'])
+@limiter.limit("100 per hour")
+def get_agents_batch():
+    """Get several agents' prompts in one call"""
+    try:
+        data = request.get_json(silent=True)
+
+        if not isinstance(data, dict) or not isinstance(data.get('ids'), list) or not data['ids']:
+            return jsonify({'error': 'ids must be a non-empty list of agent IDs'}), 400
+
+        # Keep request order, drop duplicates
+        agent_ids = list(dict.fromkeys(str(agent_id) for agent_id in data['ids']))
+        if len(agent_ids) > MAX_BATCH_SIZE:
+            return jsonify({'error': f"At most {MAX_BATCH_SIZE} agents per batch"}), 400
+
+        errors = []
+        valid_ids = []
+        for agent_id in agent_ids:
+            is_valid, error_msg = validate_agent_id(agent_id)
+            if is_valid:
+                valid_ids.append(agent_id)
+            else:
+                errors.append({'id': agent_id, 'error': error_msg, 'status': 400})
+
+        if agent_backend is None:
+            return jsonify({'error': 'Agent storage not configured'}), 500
+
+        logger.info(f"Loading {len(valid_ids)} agents (batch)")
+
+        agents, fetch_errors = google_async.run(fetch_agents(valid_ids))
+        errors.extend(fetch_errors)
+
+        logger.info(f"Loaded {len(agents)} agents, {len(errors)} failed (batch)")
+
+        return encoded_response(EncodedBody({
+            'agents': agents,
+            'errors': errors,
+            'count': len(agents)
+        }))
 
-    except HttpError as e:
-        logger.error(f"Google API error: {e}")
-        return jsonify({'error': 'Agent not found or access denied'}), 404
     except Exception as e:
-        logger.error(f"Error loading agent: {e}")
+        logger.error(f"Error loading agent batch: {e}")
         return jsonify({'error': str(e)}), 500
 
 @app.route('/agents', methods=['POST'])
@@ -579,41 +1346,25 @@ def create_agent():
 
         content = ''.join(content_parts)
 
-        # Create document
-        doc = docs_service.documents().create(body={
-            'title': agent_name
-        }).execute()
-
-        doc_id = doc['documentId']
-
-        # Write content
-        docs_service.documents().batchUpdate(
-            documentId=doc_id,
-            body={
-                'requests': [{
-                    'insertText': {
-                        'location': {'index': 1},
-                        'text': content
-                    }
-                }]
-            }
-        ).execute()
-
-        # Move to agents folder
-        folder_id = config.get('agent_folder_id')
-        if folder_id:
-            drive_service.files().update(
-                fileId=doc_id,
-                addParents=folder_id,
-                fields='id, parents'
-            ).execute()
-
-        logger.info(f"✅ Created agent: {agent_name} (ID: {doc_id})")
+        if agent_backend is None:
+            return jsonify({'error': 'Agent storage not configured'}), 500
+
+        # Create the agent with its content - one round trip for Drive
+        start = time.perf_counter()
+        created = agent_backend.create(agent_name, content)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        doc_id = created['id']
+
+        if agent_index.primed:
+            remember_listed_agent(agent_summary(created))
+
+        logger.info(f"✅ Created agent: {agent_name} (ID: {doc_id}) in {elapsed_ms:.0f} ms")
 
         return jsonify({
             'id': doc_id,
             'name': agent_name,
-            'url': f"https://docs.google.com/document/d/{doc_id}",
+            'url': agent_backend.url(doc_id),
             'message': 'Agent created successfully'
         }), 201
 
@@ -633,6 +1384,7 @@ def not_found(e):
 def rate_limit_exceeded(e):
     """Handle rate limit errors"""
     logger.warning(f"Rate limit exceeded from {get_remote_address()}")
+    metrics.rate_limited.inc(route=request.endpoint or 'unmatched')
     return jsonify({
         'error': 'Rate limit exceeded',
         'message': 'Too many requests. Please try again later.',
@@ -645,6 +1397,108 @@ def server_error(e):
     logger.error(f"Server error: {e}")
     return jsonify({'error': 'Internal server error'}), 500
 
+def server_settings():
+    """Serving settings from config.json merged over defaults"""
+    settings = dict(SERVER_DEFAULTS)
+    if config:
+        settings.update(config.get('server', {}))
+
+    if settings['mode'] not in SERVER_MODES:
+        logger.warning(f"Unknown server mode '{settings['mode']}', using 'waitress'")
+        settings['mode'] = 'waitress'
+
+    return settings
+
+def run_development(settings):
+    """Serve with the Werkzeug development server"""
+    app.run(
+        host=settings['host'],
+        port=settings['port'],
+        debug=False,
+        use_reloader=False,
+        threaded=True
+    )
+
+def run_waitress(settings):
+    """Serve with waitress (multi-threaded, single process - works on Windows)"""
+    from waitress import serve
+
+    serve(
+        app,
+        host=settings['host'],
+        port=settings['port'],
+        threads=settings['threads'],
+        connection_limit=settings['connection_limit'],
+        backlog=settings['backlog'],
+        channel_timeout=settings['request_timeout'],
+        ident=APP_NAME
+    )
+
+def run_gunicorn(settings):
+    """Serve with gunicorn (pre-fork workers with threads - Linux/macOS only)"""
+    from gunicorn.app.base import BaseApplication
+
+    def post_fork(server, worker):
+        # Google transports and background threads don't survive fork
+        initialize_services()
+
+    options = {
+        'bind': f"{settings['host']}:{settings['port']}",
+        'workers': settings['workers'],
+        'threads': settings['threads'],
+        'worker_connections': settings['connection_limit'],
+        'backlog': settings['backlog'],
+        'timeout': settings['request_timeout'],
+        'keepalive': settings['keepalive'],
+        'post_fork': post_fork
+    }
+
+    class AgentServerApplication(BaseApplication):
+        """Embedded gunicorn application serving the Flask app"""
+
+        def load_config(self):
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return app
+
+    # Workers start their own watcher, prober and token refresher after fork
+    if changes_watcher:
+        changes_watcher.stop()
+    if credential_manager:
+        credential_manager.stop()
+    health_prober.stop()
+    # An SQLite connection must not cross a fork - workers reopen the store after it
+    if agent_store:
+        agent_store.close()
+
+    AgentServerApplication().run()
+
+def run_server():
+    """Serve the app with the configured server mode"""
+    settings = server_settings()
+    mode = settings['mode']
+
+    if mode == 'gunicorn' and sys.platform == 'win32':
+        logger.warning("gunicorn is not available on Windows, using waitress")
+        mode = 'waitress'
+
+    runners = {
+        'waitress': run_waitress,
+        'gunicorn': run_gunicorn,
+        'development': run_development
+    }
+
+    try:
+        logger.info(f"Serving on {settings['host']}:{settings['port']} ({mode})")
+        runners[mode](settings)
+    except ImportError as e:
+        if mode == 'development':
+            raise
+        logger.warning(f"{mode} not installed ({e}), falling back to development server")
+        run_development(settings)
+
 def print_startup_banner():
     """Print startup information"""
     print()
@@ -652,7 +1506,8 @@ def print_startup_banner():
     print(f"  {APP_NAME} v{VERSION}")
     print("=" * 70)
     print()
-    print(f"✅ Server running on: http://localhost:3000")
+    settings = server_settings()
+    print(f"✅ Server running on: http://localhost:{settings['port']} ({settings['mode']})")
     print(f"✅ Public URL: {ngrok_url}")
     print()
     print("🔑 API KEY (IMPORTANT - COPY THIS):")
@@ -707,12 +1562,7 @@ def main():
         print_startup_banner()
 
         # Start Flask server
-        app.run(
-            host='0.0.0.0',
-            port=3000,
-            debug=False,
-            use_reloader=False
-        )
+        run_server()
 
         return 0
 
@@ -0,0 +1,153 @@
+# agent_store.py
+"""
+Persistent local agent store for AI Agent Manager
+SQLite copy of agent metadata and extracted prompts, keyed by doc ID and revision,
+used for instant cold starts and for serving while Google is unreachable
+"""
+
+import sqlite3
+import threading
+import time
+from collections import Counter
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS agents (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    modified TEXT,
+    revision TEXT,
+    prompt TEXT,
+    fetched_at REAL
+);
+CREATE TABLE IF NOT EXISTS listing (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    modified TEXT
+);
+CREATE TABLE IF NOT EXISTS usage (
+    id TEXT PRIMARY KEY,
+    loads INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+# Buffered load counts are flushed after this many loads or seconds
+USAGE_FLUSH_LOADS = 50
+USAGE_FLUSH_SECONDS = 60
+
+class AgentStore:
+    """SQLite-backed store of agent prompts and the last known folder listing"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._pending_uses = Counter()
+        self._last_usage_flush = time.monotonic()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            # WAL lets several worker processes read while one writes
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.executescript(SCHEMA)
+
+    def save_agent(self, agent_id, revision, prompt, name, modified):
+        """Write through a freshly fetched agent"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO agents (id, name, modified, revision, prompt, fetched_at) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (agent_id, name, modified, revision, prompt, time.time())
+            )
+
+    def get_agent(self, agent_id):
+        """Return stored agent as a dict, or None"""
+        with self._lock:
+            row = self._conn.execute('SELECT * FROM agents WHERE id = ?', (agent_id,)).fetchone()
+        return dict(row) if row else None
+
+    def load_agents(self):
+        """Return all stored agents"""
+        with self._lock:
+            rows = self._conn.execute('SELECT * FROM agents').fetchall()
+        return [dict(row) for row in rows]
+
+    def remove_prompt(self, agent_id):
+        """Drop an agent's saved prompt (it was edited) but keep it listed"""
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM agents WHERE id = ?', (agent_id,))
+
+    def has_agent(self, agent_id):
+        """True if the store holds a prompt, listing entry or load count for an agent"""
+        with self._lock:
+            if agent_id in self._pending_uses:
+                return True
+            row = self._conn.execute(
+                'SELECT 1 FROM agents WHERE id = ? UNION ALL SELECT 1 FROM listing WHERE id = ? '
+                'UNION ALL SELECT 1 FROM usage WHERE id = ? LIMIT 1',
+                (agent_id, agent_id, agent_id)
+            ).fetchone()
+        return row is not None
+
+    def remove_agent(self, agent_id):
+        """Forget an agent that was trashed or moved out of the folder"""
+        with self._lock, self._conn:
+            self._pending_uses.pop(agent_id, None)
+            self._conn.execute('DELETE FROM agents WHERE id = ?', (agent_id,))
+            self._conn.execute('DELETE FROM listing WHERE id = ?', (agent_id,))
+            self._conn.execute('DELETE FROM usage WHERE id = ?', (agent_id,))
+
+    def save_listing(self, agents):
+        """Replace the stored folder listing"""
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM listing')
+            self._conn.executemany(
+                'INSERT INTO listing (id, name, modified) VALUES (?, ?, ?)',
+                [(agent['id'], agent['name'], agent.get('modified')) for agent in agents]
+            )
+
+    def upsert_listing(self, agent):
+        """Add or update one agent in the stored listing"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO listing (id, name, modified) VALUES (?, ?, ?)',
+                (agent['id'], agent['name'], agent.get('modified'))
+            )
+
+    def load_listing(self):
+        """Return the stored folder listing ordered by name"""
+        with self._lock:
+            rows = self._conn.execute('SELECT id, name, modified FROM listing ORDER BY name').fetchall()
+        return [dict(row) for row in rows]
+
+    def record_use(self, agent_id):
+        """Count an agent load (buffered in memory, flushed in batches)"""
+        with self._lock:
+            self._pending_uses[agent_id] += 1
+            due = (sum(self._pending_uses.values()) >= USAGE_FLUSH_LOADS
+                   or time.monotonic() - self._last_usage_flush >= USAGE_FLUSH_SECONDS)
+            if due:
+                self._flush_usage()
+
+    def top_agents(self, limit):
+        """Return IDs of the most loaded agents, most used first"""
+        with self._lock:
+            self._flush_usage()
+            rows = self._conn.execute('SELECT id FROM usage ORDER BY loads DESC LIMIT ?', (limit,)).fetchall()
+        return [row['id'] for row in rows]
+
+    def close(self):
+        """Flush usage counts and close the database"""
+        with self._lock:
+            self._flush_usage()
+            self._conn.close()
+
+    def _flush_usage(self):
+        """Write buffered load counts (lock held)"""
+        if self._pending_uses:
+            with self._conn:
+                self._conn.executemany(
+                    'INSERT INTO usage (id, loads) VALUES (?, ?) '
+                    'ON CONFLICT(id) DO UPDATE SET loads = loads + excluded.loads',
+                    list(self._pending_uses.items())
+                )
+            self._pending_uses.clear()
+        self._last_usage_flush = time.monotonic()
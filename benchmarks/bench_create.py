@@ -0,0 +1,80 @@
+# bench_create.py
+"""
+Benchmark agent creation
+Compares the single files.create upload used by POST /agents with the previous
+documents.create + batchUpdate + files.update sequence. Test docs are created in
+the agent folder and trashed afterwards
+
+Usage: python benchmarks/bench_create.py [--rounds 3]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import agent_server
+from google_clients import build_services, create_doc
+
+SAMPLE_CONTENT = open(os.path.join(ROOT, 'templates', 'sales_agent.txt'), encoding='utf-8').read()
+
+def create_single_call(drive, docs, folder_id, name):
+    """Current path: one files.create with a text/plain upload"""
+    return create_doc(drive, name, SAMPLE_CONTENT, parent_id=folder_id)['id']
+
+def create_three_calls(drive, docs, folder_id, name):
+    """Previous path: create, insert text, move to folder"""
+    doc_id = docs.documents().create(body={'title': name}).execute()['documentId']
+    docs.documents().batchUpdate(
+        documentId=doc_id,
+        body={'requests': [{'insertText': {'location': {'index': 1}, 'text': SAMPLE_CONTENT}}]}
+    ).execute()
+    drive.files().update(fileId=doc_id, addParents=folder_id, fields='id, parents').execute()
+    return doc_id
+
+def main():
+    """Run the benchmark"""
+    parser = argparse.ArgumentParser(description='Benchmark agent creation')
+    parser.add_argument('--rounds', type=int, default=3, help='Docs created per path')
+    args = parser.parse_args()
+
+    config = agent_server.load_config()
+    creds = agent_server.load_credentials()
+    if not config or not creds:
+        print("❌ Run setup first (config.json and credentials are required)")
+        return 1
+
+    drive, docs, _ = build_services(creds)
+    folder_id = config['agent_folder_id']
+    created = []
+
+    # Warm up token refresh and connections
+    drive.about().get(fields='user').execute()
+
+    print(f"Creating {args.rounds} docs per path")
+    print()
+    print(f"{'path':<12} {'mean ms':>9} {'min ms':>8} {'max ms':>8}")
+
+    try:
+        for label, creator in (('three-call', create_three_calls), ('single-call', create_single_call)):
+            latencies = []
+            for i in range(args.rounds):
+                start = time.perf_counter()
+                created.append(creator(drive, docs, folder_id, f"bench-create-{label}-{i}"))
+                latencies.append((time.perf_counter() - start) * 1000)
+            print(f"{label:<12} {statistics.mean(latencies):>9.0f} {min(latencies):>8.0f} {max(latencies):>8.0f}")
+    finally:
+        for doc_id in created:
+            drive.files().update(fileId=doc_id, body={'trashed': True}).execute()
+        print()
+        print(f"Trashed {len(created)} test docs")
+
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
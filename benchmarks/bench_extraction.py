@@ -0,0 +1,115 @@
+# bench_extraction.py
+"""
+Benchmark prompt extraction engines
+Compares per-load latency and bytes transferred for the 'docs' engine (with and
+without the field mask) and the 'export' engine
+against the real agent folder (uses config.json and your saved credentials)
+
+Usage: python benchmarks/bench_extraction.py [--agents 5] [--rounds 3]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import httplib2
+from google_auth_httplib2 import AuthorizedHttp
+from googleapiclient.discovery import build
+
+import agent_server
+from agent_backends import DriveBackend
+
+class CountingHttp(httplib2.Http):
+    """httplib2 transport that counts response body bytes"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.bytes_received = 0
+
+    def request(self, *args, **kwargs):
+        resp, content = super().request(*args, **kwargs)
+        self.bytes_received += len(content or b'')
+        return resp, content
+
+def load_agent(backend, agent_id):
+    """Cold load: metadata call + prompt fetch with the backend's current engine"""
+    backend.metadata(agent_id)
+    return backend.content(agent_id)
+
+def percentile(values, pct):
+    """Nearest-rank percentile"""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+def run_engine(backend, engine, field_mask, loader, agent_ids, rounds, transport):
+    """Load every agent `rounds` times, returns (latencies_ms, bytes_per_load)"""
+    backend.engine = engine
+    backend.field_mask = field_mask
+    latencies = []
+    transport.bytes_received = 0
+
+    for _ in range(rounds):
+        for agent_id in agent_ids:
+            start = time.perf_counter()
+            loader(backend, agent_id)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    return latencies, transport.bytes_received / len(latencies)
+
+def main():
+    """Run the benchmark"""
+    parser = argparse.ArgumentParser(description='Benchmark prompt extraction engines')
+    parser.add_argument('--agents', type=int, default=5, help='Number of agents to load')
+    parser.add_argument('--rounds', type=int, default=3, help='Loads per agent per engine')
+    parser.add_argument('--export-mime-type', default='text/plain', choices=agent_server.EXPORT_MIME_TYPES)
+    args = parser.parse_args()
+
+    config = agent_server.load_config()
+    creds = agent_server.load_credentials()
+    if not config or not creds:
+        print("❌ Run setup first (config.json and credentials are required)")
+        return 1
+
+    transport = CountingHttp()
+    authed = AuthorizedHttp(creds, http=transport)
+    backend = DriveBackend(
+        build('drive', 'v3', http=authed),
+        build('docs', 'v1', http=authed),
+        config['agent_folder_id'],
+        export_mime_type=args.export_mime_type
+    )
+
+    files, _ = backend.list_page(page_size=args.agents)
+    agent_ids = [file['id'] for file in files]
+    if not agent_ids:
+        print("❌ No agents found in the agent folder")
+        return 1
+
+    # Warm up token refresh and connections so the first engine isn't penalised
+    load_agent(backend, agent_ids[0])
+
+    print(f"Loading {len(agent_ids)} agents x {args.rounds} rounds per engine")
+    print()
+    print(f"{'engine':<10} {'loads':>6} {'mean ms':>9} {'p50 ms':>8} {'p95 ms':>8} {'bytes/load':>11}")
+
+    variants = (
+        ('docs-full', 'docs', False, load_agent),
+        ('docs', 'docs', True, load_agent),
+        ('export', 'export', True, load_agent)
+    )
+    for label, engine, field_mask, loader in variants:
+        latencies, bytes_per_load = run_engine(backend, engine, field_mask, loader, agent_ids, args.rounds, transport)
+        print(f"{label:<10} {len(latencies):>6} {statistics.mean(latencies):>9.1f} "
+              f"{percentile(latencies, 50):>8.1f} {percentile(latencies, 95):>8.1f} {bytes_per_load:>11.0f}")
+
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,214 @@
+# bench_load.py
+"""
+End-to-end load test against a local fake of Google
+Starts benchmarks/fake_google.py (with injected latency and errors) and the
+server pointed at it, then drives GET /agents, GET /agents/{id} and POST /agents
+at increasing concurrency and reports throughput and p50/p95/p99 latency per
+endpoint. Needs no Google account or quota
+
+Usage: python benchmarks/bench_load.py [--concurrency 1 4 16] [--duration 5] [--latency-ms 80] [--error-rate 0.01] [--cold]
+"""
+
+import argparse
+import itertools
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import requests
+
+from bench_serving import free_port, percentile, wait_for_port
+from fake_google import FOLDER_ID
+
+API_KEY = 'bench-load-key'
+ENDPOINTS = ('list_agents', 'get_agent', 'create_agent')
+
+def serve(mode, port, scratch, threads, workers):
+    """Child process: initialize the server against the fake and serve it"""
+    os.chdir(scratch)
+    import agent_server
+
+    # Measure the app, not the rate limiter (init_app re-reads the flag when storage is configured)
+    agent_server.app.config['RATELIMIT_ENABLED'] = False
+    agent_server.limiter.enabled = False
+    if not agent_server.initialize_services():
+        sys.exit(1)
+
+    settings = dict(agent_server.SERVER_DEFAULTS)
+    settings.update({'host': '127.0.0.1', 'port': port, 'threads': threads, 'workers': workers})
+
+    runners = {
+        'development': agent_server.run_development,
+        'waitress': agent_server.run_waitress,
+        'gunicorn': agent_server.run_gunicorn
+    }
+    runners[mode](settings)
+
+def write_scratch_setup(scratch, fake_port, cold):
+    """config.json and a never-expiring token for the server under test"""
+    config = {
+        'api_key': API_KEY,
+        'agent_folder_id': FOLDER_ID,
+        'agent_folder_name': 'Fake agents',
+        'google_api_root': f'http://127.0.0.1:{fake_port}/',
+        'agent_store_path': '',
+        'rate_limit_storage': 'memory://',
+        'health_probe_interval': 3600,
+        'logging': {'level': 'WARNING'},
+        # Start measuring with the cache already warm
+        'warmup': {'blocking': True}
+    }
+    if cold:
+        # Every request goes through to the fake
+        config.update({'watch_changes': False, 'prompt_cache_size': 0, 'warmup': {'enabled': False}})
+
+    with open(os.path.join(scratch, 'config.json'), 'w', encoding='utf-8') as f:
+        json.dump(config, f, indent=2)
+
+    # The fake accepts any token - this one just never needs refreshing
+    with open(os.path.join(scratch, 'credentials.json'), 'w', encoding='utf-8') as f:
+        json.dump({
+            'token': 'bench-load-token',
+            'refresh_token': 'unused',
+            'client_id': 'unused',
+            'client_secret': 'unused',
+            'expiry': '2099-01-01T00:00:00Z'
+        }, f)
+
+def workload(endpoint, base_url, agent_ids, counter):
+    """Function issuing one request for an endpoint, returns the response"""
+    headers = {'Authorization': f'Bearer {API_KEY}'}
+
+    if endpoint == 'list_agents':
+        return lambda session: session.get(f'{base_url}/agents', headers=headers, timeout=30)
+
+    if endpoint == 'get_agent':
+        return lambda session: session.get(f'{base_url}/agents/{random.choice(agent_ids)}', headers=headers, timeout=30)
+
+    def create(session):
+        return session.post(f'{base_url}/agents', headers=headers, timeout=30, json={
+            'name': f'Load Test {next(counter)}',
+            'purpose': 'Created by bench_load.py',
+            'skills': ['Answer questions', 'Summarize documents']
+        })
+    return create
+
+def generate_load(issue, concurrency, duration):
+    """Call issue(session) from `concurrency` keep-alive clients for `duration` seconds"""
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def worker():
+        session = requests.Session()
+        local_latencies = []
+        local_errors = 0
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            try:
+                response = issue(session)
+                if response.status_code not in (200, 201):
+                    local_errors += 1
+            except requests.RequestException:
+                local_errors += 1
+            local_latencies.append((time.perf_counter() - start) * 1000)
+        with lock:
+            latencies.extend(local_latencies)
+            errors[0] += local_errors
+
+    workers = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+
+    return latencies, errors[0]
+
+def main():
+    """Run the benchmark"""
+    parser = argparse.ArgumentParser(description='End-to-end load test against a local fake of Google')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 16], help='Client counts to step through')
+    parser.add_argument('--duration', type=float, default=5, help='Seconds of load per endpoint and concurrency')
+    parser.add_argument('--endpoints', nargs='+', default=list(ENDPOINTS), choices=ENDPOINTS)
+    parser.add_argument('--agents', type=int, default=50, help='Agents seeded into the fake folder')
+    parser.add_argument('--latency-ms', type=float, default=80, help='Fake Google latency per call')
+    parser.add_argument('--jitter-ms', type=float, default=20, help='Fake latency varies by up to +/- this much')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of fake Google calls that fail with 503')
+    parser.add_argument('--cold', action='store_true', help='No prompt cache or changes watcher - every request reaches the fake')
+    parser.add_argument('--mode', default='waitress', choices=['development', 'waitress', 'gunicorn'])
+    parser.add_argument('--threads', type=int, default=8, help='Server threads (waitress, gunicorn)')
+    parser.add_argument('--workers', type=int, default=2, help='Server processes (gunicorn)')
+    parser.add_argument('--serve', choices=['development', 'waitress', 'gunicorn'], help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--scratch', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.port, args.scratch, args.threads, args.workers)
+        return 0
+
+    with tempfile.TemporaryDirectory() as scratch:
+        fake_port = free_port()
+        fake = subprocess.Popen(
+            [sys.executable, os.path.join(ROOT, 'benchmarks', 'fake_google.py'), '--port', str(fake_port),
+             '--agents', str(args.agents), '--latency-ms', str(args.latency_ms),
+             '--jitter-ms', str(args.jitter_ms), '--error-rate', str(args.error_rate)],
+            stdout=subprocess.DEVNULL
+        )
+        port = free_port()
+        server = None
+        try:
+            if not wait_for_port(fake_port):
+                print("❌ Fake Google failed to start")
+                return 1
+
+            write_scratch_setup(scratch, fake_port, args.cold)
+            server = subprocess.Popen(
+                [sys.executable, os.path.abspath(__file__), '--serve', args.mode, '--port', str(port),
+                 '--scratch', scratch, '--threads', str(args.threads), '--workers', str(args.workers)],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL
+            )
+            # Blocking warm-up runs before the port opens
+            if not wait_for_port(port, timeout=120):
+                print(f"❌ Server failed to start (see {os.path.join(scratch, 'agent-server.log')})")
+                return 1
+
+            base_url = f'http://127.0.0.1:{port}'
+            listing = requests.get(f'{base_url}/agents', headers={'Authorization': f'Bearer {API_KEY}'}, timeout=60)
+            agent_ids = [agent['id'] for agent in listing.json()['agents']]
+            counter = itertools.count(1)
+
+            print(f"{args.mode}, {args.threads} threads; fake Google {args.latency_ms:.0f}±{args.jitter_ms:.0f} ms, "
+                  f"{args.error_rate:.1%} errors; {'cold (no cache)' if args.cold else 'warm cache'}; "
+                  f"{args.duration:.0f}s per run")
+            print()
+            print(f"{'endpoint':<14} {'clients':>7} {'requests':>9} {'req/s':>8} "
+                  f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+
+            for endpoint in args.endpoints:
+                issue = workload(endpoint, base_url, agent_ids, counter)
+                for concurrency in args.concurrency:
+                    latencies, errors = generate_load(issue, concurrency, args.duration)
+                    print(f"{endpoint:<14} {concurrency:>7} {len(latencies):>9} {len(latencies) / args.duration:>8.1f} "
+                          f"{percentile(latencies, 50):>8.1f} {percentile(latencies, 95):>8.1f} "
+                          f"{percentile(latencies, 99):>8.1f} {errors:>7}")
+        finally:
+            for child in (server, fake):
+                if child:
+                    child.terminate()
+                    child.wait()
+
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,145 @@
+# bench_serving.py
+"""
+Benchmark server modes
+Measures request throughput and latency of the development server, waitress and
+gunicorn serving the unauthenticated /health endpoint (no Google API calls), so
+the numbers reflect serving overhead only
+
+Usage: python benchmarks/bench_serving.py [--modes development waitress] [--concurrency 16] [--duration 10]
+"""
+
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import requests
+
+def serve(mode, port, threads, workers):
+    """Child process: run the app in the given server mode"""
+    os.chdir(ROOT)
+    import agent_server
+
+    # Serving overhead only - no rate limits, no Google services in workers
+    agent_server.limiter.enabled = False
+    agent_server.initialize_services = lambda: True
+
+    settings = dict(agent_server.SERVER_DEFAULTS)
+    settings.update({'host': '127.0.0.1', 'port': port, 'threads': threads, 'workers': workers})
+
+    runners = {
+        'development': agent_server.run_development,
+        'waitress': agent_server.run_waitress,
+        'gunicorn': agent_server.run_gunicorn
+    }
+    runners[mode](settings)
+
+def free_port():
+    """Pick an unused local port"""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def wait_for_port(port, timeout=20):
+    """Wait until the child server accepts connections"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=1):
+                return True
+        except OSError:
+            time.sleep(0.1)
+    return False
+
+def percentile(values, pct):
+    """Nearest-rank percentile"""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+def generate_load(url, concurrency, duration):
+    """Hit url from `concurrency` keep-alive clients for `duration` seconds"""
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def worker():
+        session = requests.Session()
+        local_latencies = []
+        local_errors = 0
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            try:
+                response = session.get(url, timeout=10)
+                if response.status_code != 200:
+                    local_errors += 1
+            except requests.RequestException:
+                local_errors += 1
+            local_latencies.append((time.perf_counter() - start) * 1000)
+        with lock:
+            latencies.extend(local_latencies)
+            errors[0] += local_errors
+
+    workers = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+
+    return latencies, errors[0]
+
+def main():
+    """Run the benchmark"""
+    parser = argparse.ArgumentParser(description='Benchmark server modes')
+    parser.add_argument('--modes', nargs='+', default=['development', 'waitress'],
+                        choices=['development', 'waitress', 'gunicorn'])
+    parser.add_argument('--concurrency', type=int, default=16, help='Concurrent client connections')
+    parser.add_argument('--duration', type=float, default=10, help='Seconds of load per mode')
+    parser.add_argument('--threads', type=int, default=8, help='Server threads (waitress, gunicorn)')
+    parser.add_argument('--workers', type=int, default=2, help='Server processes (gunicorn)')
+    parser.add_argument('--serve', choices=['development', 'waitress', 'gunicorn'], help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.port, args.threads, args.workers)
+        return 0
+
+    print(f"{args.concurrency} clients, {args.duration:.0f}s per mode, GET /health")
+    print()
+    print(f"{'mode':<12} {'requests':>9} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+
+    for mode in args.modes:
+        port = free_port()
+        child = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), '--serve', mode, '--port', str(port),
+             '--threads', str(args.threads), '--workers', str(args.workers)],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        )
+        try:
+            if not wait_for_port(port):
+                print(f"{mode:<12} failed to start")
+                continue
+
+            # Let gunicorn workers finish booting
+            time.sleep(1)
+            latencies, errors = generate_load(f'http://127.0.0.1:{port}/health', args.concurrency, args.duration)
+            print(f"{mode:<12} {len(latencies):>9} {len(latencies) / args.duration:>8.0f} "
+                  f"{percentile(latencies, 50):>8.1f} {percentile(latencies, 95):>8.1f} "
+                  f"{percentile(latencies, 99):>8.1f} {errors:>7}")
+        finally:
+            child.terminate()
+            child.wait()
+
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
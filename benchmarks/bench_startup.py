@@ -0,0 +1,111 @@
+# bench_startup.py
+"""
+Benchmark server startup
+Times importing agent_server and building the Drive/Docs services from the
+full bundled discovery docs versus the trimmed, cached ones, each in a fresh
+interpreter, and reports peak resident memory. Runs on Linux (no Google
+account, ngrok or Windows DPAPI needed)
+
+Usage: python benchmarks/bench_startup.py [--runs 5]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB"""
+    import resource
+    # ru_maxrss is KB on Linux, bytes on macOS
+    scale = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+def child(variant, cache_dir):
+    """Child process: measure one startup variant and print JSON"""
+    sys.path.insert(0, ROOT)
+    # Logs and caches go to the scratch directory, not the repo
+    os.chdir(cache_dir)
+
+    started = time.perf_counter()
+    import agent_server  # noqa: F401 - the import itself is what's measured
+    import google_clients
+    imported = time.perf_counter()
+
+    from google.oauth2.credentials import Credentials
+    google_clients.DISCOVERY_CACHE_DIR = os.path.join(cache_dir, 'discovery-cache')
+    google_clients.build_services(Credentials('benchmark-token'), discovery=variant)
+    built = time.perf_counter()
+    rss_mb = peak_rss_mb()
+
+    # What startup no longer pays: modules now imported on first use
+    # (win32crypt is Windows-only and not measured here)
+    from pyngrok import ngrok  # noqa: F401
+    import yaml  # noqa: F401
+    deferred = time.perf_counter()
+
+    print(json.dumps({
+        'import_ms': (imported - started) * 1000,
+        'build_ms': (built - imported) * 1000,
+        'deferred_ms': (deferred - built) * 1000,
+        'rss_mb': rss_mb
+    }))
+
+def run_child(variant, cache_dir):
+    """Run one measurement in a fresh interpreter"""
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--child', variant, '--cache-dir', cache_dir],
+        capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--child', choices=['static', 'trimmed'])
+    parser.add_argument('--cache-dir')
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.cache_dir)
+        return 0
+
+    print(f"{args.runs} fresh interpreters per variant, median shown")
+    print()
+    print(f"{'variant':<16} {'import ms':>10} {'build ms':>10} {'total ms':>10} {'peak RSS MB':>12} {'deferred ms':>12}")
+
+    with tempfile.TemporaryDirectory() as scratch:
+        variants = [
+            # Cache wiped before every run - pays for trimming each time
+            ('trimmed (cold)', 'trimmed', True),
+            ('trimmed (warm)', 'trimmed', False),
+            ('static', 'static', False)
+        ]
+        for label, variant, cold in variants:
+            results = []
+            for _ in range(args.runs):
+                if cold:
+                    shutil.rmtree(os.path.join(scratch, 'discovery-cache'), ignore_errors=True)
+                results.append(run_child(variant, scratch))
+
+            import_ms = statistics.median(r['import_ms'] for r in results)
+            build_ms = statistics.median(r['build_ms'] for r in results)
+            rss_mb = statistics.median(r['rss_mb'] for r in results)
+            deferred_ms = statistics.median(r['deferred_ms'] for r in results)
+            print(f"{label:<16} {import_ms:>10.0f} {build_ms:>10.1f} {import_ms + build_ms:>10.0f} "
+                  f"{rss_mb:>12.1f} {deferred_ms:>12.0f}")
+
+    print()
+    print("deferred ms: pyngrok + yaml import time, now only paid when the tunnel is started")
+
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
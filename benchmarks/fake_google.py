@@ -0,0 +1,372 @@
+# fake_google.py
+"""
+Local stand-in for the Google Drive v3 and Docs v1 endpoints this app calls
+Serves an in-memory agent folder over HTTP with injected latency and errors, so
+the server can be load-tested without Google quota. Point the server at it with
+"google_api_root" in config.json (any OAuth token is accepted)
+
+Usage: python benchmarks/fake_google.py [--port 8099] [--agents 50] [--latency-ms 80] [--error-rate 0.01]
+"""
+
+import argparse
+import email.parser
+import json
+import os
+import random
+import re
+import secrets
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FOLDER_ID = 'fake-agent-folder'
+DOC_MIME_TYPE = 'application/vnd.google-apps.document'
+
+# Drive caps files.list pages at 1000
+MAX_PAGE_SIZE = 1000
+
+class FakeGoogleError(Exception):
+    """An HTTP error response in Google's JSON error format"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+def now():
+    """Current time in Drive's RFC 3339 format"""
+    moment = datetime.now(timezone.utc)
+    return moment.strftime('%Y-%m-%dT%H:%M:%S.') + f"{moment.microsecond // 1000:03d}Z"
+
+def new_file_id():
+    """44-character ID shaped like a Google Doc ID"""
+    return secrets.token_urlsafe(33)
+
+class FakeDrive:
+    """In-memory Drive folder of Google Docs, with a change log for the changes API"""
+
+    def __init__(self):
+        self.files = {}
+        self.changes = []
+        self._lock = threading.Lock()
+
+    def seed(self, count):
+        """Fill the agent folder with count agents built from the starter templates"""
+        templates = []
+        template_dir = os.path.join(ROOT, 'templates')
+        for name in sorted(os.listdir(template_dir)):
+            with open(os.path.join(template_dir, name), 'r', encoding='utf-8') as f:
+                templates.append(f.read())
+
+        for index in range(count):
+            self.create({'name': f"Agent {index:04d}", 'mimeType': DOC_MIME_TYPE, 'parents': [FOLDER_ID]},
+                        templates[index % len(templates)])
+
+    def create(self, body, text=''):
+        with self._lock:
+            file = {
+                'id': new_file_id(),
+                'name': body.get('name', 'Untitled'),
+                'mimeType': body.get('mimeType', DOC_MIME_TYPE),
+                'parents': body.get('parents', []),
+                'trashed': False,
+                'modifiedTime': now(),
+                'text': text
+            }
+            self.files[file['id']] = file
+            self.changes.append(file['id'])
+            return self.resource(file)
+
+    def update(self, file_id, body, text=None):
+        with self._lock:
+            file = self._get(file_id)
+            if body.get('name'):
+                file['name'] = body['name']
+            if text is not None:
+                file['text'] = text
+            file['modifiedTime'] = now()
+            self.changes.append(file_id)
+            return self.resource(file)
+
+    def _get(self, file_id):
+        file = self.files.get(file_id)
+        if file is None or file['trashed']:
+            raise FakeGoogleError(404, f"File not found: {file_id}")
+        return file
+
+    def get(self, file_id):
+        return self.resource(self._get(file_id))
+
+    def text(self, file_id):
+        return self._get(file_id)['text']
+
+    def list(self, query, page_size, page_token):
+        """files.list for the "'<folder>' in parents" queries the app sends, ordered by name"""
+        match = re.search(r"'([^']+)' in parents", query or '')
+        parent = match.group(1) if match else None
+        with self._lock:
+            files = sorted(
+                (file for file in self.files.values()
+                 if not file['trashed'] and (parent is None or parent in file['parents'])),
+                key=lambda file: file['name']
+            )
+        start = int(page_token or 0)
+        end = start + min(page_size, MAX_PAGE_SIZE)
+        result = {'files': [self.resource(file) for file in files[start:end]]}
+        if end < len(files):
+            result['nextPageToken'] = str(end)
+        return result
+
+    def list_changes(self, page_token):
+        start = int(page_token)
+        with self._lock:
+            changed = self.changes[start:]
+            files = [self.resource(self.files[file_id]) for file_id in changed]
+            token = str(len(self.changes))
+        return {
+            'changes': [{'fileId': file['id'], 'removed': False, 'file': file} for file in files],
+            'newStartPageToken': token
+        }
+
+    @staticmethod
+    def resource(file):
+        """Drive file resource (every field the app asks for, whatever the field mask)"""
+        return {key: file[key] for key in ('id', 'name', 'mimeType', 'parents', 'trashed', 'modifiedTime')}
+
+def document(file_id, title, text):
+    """Docs API document resource - one paragraph per line"""
+    lines = text.splitlines(keepends=True) or ['\n']
+    return {
+        'documentId': file_id,
+        'title': title,
+        'body': {'content': [
+            {'paragraph': {'elements': [{'textRun': {'content': line, 'textStyle': {}}}]}}
+            for line in lines
+        ]}
+    }
+
+def parse_multipart(content_type, body):
+    """Split a multipart upload into (metadata, text)"""
+    message = email.parser.BytesParser().parsebytes(
+        f"Content-Type: {content_type}\r\n\r\n".encode() + body
+    )
+    parts = [part.get_payload(decode=True) for part in message.walk() if not part.is_multipart()]
+    metadata = json.loads(parts[0] or b'{}')
+    text = parts[1].decode('utf-8') if len(parts) > 1 else None
+    return metadata, text
+
+class FakeGoogleServer(ThreadingHTTPServer):
+    """HTTP server holding the fake Drive and the fault injection settings"""
+
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, address, drive, latency_ms=0, jitter_ms=0, error_rate=0.0, error_status=503):
+        super().__init__(address, FakeGoogleHandler)
+        self.drive = drive
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.requests_served = 0
+        self.errors_injected = 0
+        self._stats_lock = threading.Lock()
+
+    def inject(self):
+        """Sleep for the configured latency, then maybe fail - returns an error status or None"""
+        delay = self.latency_ms + random.uniform(-self.jitter_ms, self.jitter_ms)
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+        failed = random.random() < self.error_rate
+        with self._stats_lock:
+            self.requests_served += 1
+            self.errors_injected += failed
+        return self.error_status if failed else None
+
+class FakeGoogleHandler(BaseHTTPRequestHandler):
+    """Routes Drive and Docs REST calls to the fake Drive"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        # Quiet - thousands of requests per benchmark run
+        pass
+
+    def do_GET(self):
+        self.handle_call()
+
+    def do_POST(self):
+        self.handle_call()
+
+    def do_PATCH(self):
+        self.handle_call()
+
+    def handle_call(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+
+        injected = self.server.inject()
+        if injected:
+            self.send(*self.error_response(injected, 'Injected failure'))
+            return
+
+        if self.command == 'POST' and urlsplit(self.path).path.startswith('/batch/'):
+            self.send(*self.batch(self.headers.get('Content-Type', ''), body))
+            return
+
+        self.send(*self.dispatch(self.command, self.path, self.headers.get('Content-Type', ''), body))
+
+    def dispatch(self, method, path, content_type, body):
+        """Handle one API call, returns (status, content_type, body bytes)"""
+        url = urlsplit(path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        route = url.path.rstrip('/')
+        drive = self.server.drive
+
+        try:
+            if method == 'GET' and route == '/drive/v3/about':
+                return self.json_response({'user': {'displayName': 'Fake User', 'emailAddress': 'fake@example.com'}})
+
+            if method == 'GET' and route == '/drive/v3/changes/startPageToken':
+                return self.json_response({'startPageToken': str(len(drive.changes))})
+
+            if method == 'GET' and route == '/drive/v3/changes':
+                return self.json_response(drive.list_changes(params.get('pageToken', '0')))
+
+            if method == 'GET' and route == '/drive/v3/files':
+                return self.json_response(drive.list(
+                    params.get('q'), int(params.get('pageSize', 100)), params.get('pageToken')
+                ))
+
+            match = re.fullmatch(r'/drive/v3/files/([^/]+)/export', route)
+            if method == 'GET' and match:
+                # Drive's text export: BOM and Windows line endings
+                text = '\ufeff' + drive.text(match.group(1)).replace('\n', '\r\n')
+                return 200, params.get('mimeType', 'text/plain'), text.encode('utf-8')
+
+            match = re.fullmatch(r'/drive/v3/files/([^/]+)', route)
+            if method == 'GET' and match:
+                return self.json_response(drive.get(match.group(1)))
+            if method == 'PATCH' and match:
+                return self.json_response(drive.update(match.group(1), json.loads(body or b'{}')))
+
+            if method == 'POST' and route == '/drive/v3/files':
+                return self.json_response(drive.create(json.loads(body or b'{}')))
+
+            if method == 'POST' and route == '/upload/drive/v3/files':
+                metadata, text = parse_multipart(content_type, body)
+                return self.json_response(drive.create(metadata, text or ''))
+
+            match = re.fullmatch(r'/upload/drive/v3/files/([^/]+)', route)
+            if method == 'PATCH' and match:
+                metadata, text = parse_multipart(content_type, body)
+                return self.json_response(drive.update(match.group(1), metadata, text))
+
+            match = re.fullmatch(r'/v1/documents/([^/:]+)', route)
+            if method == 'GET' and match:
+                file = drive.get(match.group(1))
+                return self.json_response(document(file['id'], file['name'], drive.text(file['id'])))
+
+            raise FakeGoogleError(404, f"No fake for {method} {url.path}")
+
+        except FakeGoogleError as e:
+            return self.error_response(e.status, str(e))
+
+    def batch(self, content_type, body):
+        """multipart/mixed batch: run each embedded request, answer in one multipart response"""
+        message = email.parser.BytesParser().parsebytes(
+            f"Content-Type: {content_type}\r\n\r\n".encode() + body
+        )
+        boundary = f"batch_{secrets.token_hex(8)}"
+        parts = []
+        for part in message.get_payload():
+            request_text = part.get_payload()
+            head, _, part_body = request_text.partition('\r\n\r\n') if '\r\n\r\n' in request_text \
+                else request_text.partition('\n\n')
+            lines = head.splitlines()
+            method, path, _ = lines[0].split(' ', 2)
+            headers = dict(line.split(': ', 1) for line in lines[1:] if ': ' in line)
+
+            if '/export' in path or 'alt=media' in path:
+                # Google's batch endpoint doesn't serve media downloads either
+                status, part_type, part_content = self.error_response(
+                    400, 'Media download is not supported in batch requests'
+                )
+            else:
+                status, part_type, part_content = self.dispatch(
+                    method, path, headers.get('Content-Type', ''), part_body.encode('utf-8')
+                )
+            content_id = part['Content-ID'] or ''
+            parts.append(
+                f"--{boundary}\r\n"
+                f"Content-Type: application/http\r\n"
+                f"Content-ID: <response-{content_id.strip('<>')}>\r\n\r\n"
+                f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+                f"Content-Type: {part_type}\r\n"
+                f"Content-Length: {len(part_content)}\r\n\r\n"
+            )
+            parts.append(part_content.decode('utf-8') + '\r\n')
+
+        parts.append(f"--{boundary}--\r\n")
+        return 200, f"multipart/mixed; boundary={boundary}", ''.join(parts).encode('utf-8')
+
+    @staticmethod
+    def json_response(data, status=200):
+        return status, 'application/json; charset=UTF-8', json.dumps(data).encode('utf-8')
+
+    @classmethod
+    def error_response(cls, status, message):
+        return cls.json_response({'error': {
+            'code': status,
+            'message': message,
+            'errors': [{'message': message, 'domain': 'global', 'reason': 'backendError'}]
+        }}, status=status)
+
+    def send(self, status, content_type, content):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+def start_fake_google(port=0, agents=50, **faults):
+    """Start the fake on a background thread, returns the server (server.server_port for the port)"""
+    drive = FakeDrive()
+    drive.seed(agents)
+    server = FakeGoogleServer(('127.0.0.1', port), drive, **faults)
+    threading.Thread(target=server.serve_forever, name='fake-google', daemon=True).start()
+    return server
+
+def main():
+    """Run the fake until interrupted"""
+    parser = argparse.ArgumentParser(description='Local stand-in for the Google Drive and Docs APIs')
+    parser.add_argument('--port', type=int, default=8099)
+    parser.add_argument('--agents', type=int, default=50, help='Agents seeded into the fake agent folder')
+    parser.add_argument('--latency-ms', type=float, default=80, help='Added to every response')
+    parser.add_argument('--jitter-ms', type=float, default=20, help='Latency varies by up to +/- this much')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of calls that fail')
+    parser.add_argument('--error-status', type=int, default=503, help='HTTP status of injected failures')
+    args = parser.parse_args()
+
+    server = start_fake_google(
+        args.port, args.agents,
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate, error_status=args.error_status
+    )
+    print(f"Fake Google APIs on http://127.0.0.1:{server.server_port}/ "
+          f"({args.agents} agents in folder '{FOLDER_ID}', {args.latency_ms:.0f}±{args.jitter_ms:.0f} ms, "
+          f"{args.error_rate:.1%} errors)", flush=True)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        print(f"Served {server.requests_served} requests, injected {server.errors_injected} errors")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,114 @@
+# credential_manager.py
+"""
+Google OAuth credential management for AI Agent Manager
+One shared Credentials object, refreshed under a lock - in the background
+shortly before expiry so requests don't pay for it - and persisted after refresh
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+
+import google_auth_httplib2
+import httplib2
+
+import metrics
+import tracing
+
+logger = logging.getLogger(__name__)
+
+class CredentialManager:
+    """Owns the credentials shared by every Google service and transport"""
+
+    def __init__(self, credentials, on_refresh=None, refresh_margin=300, timeout=60):
+        self.credentials = credentials
+        self.on_refresh = on_refresh
+        self.refresh_margin = refresh_margin
+        self.timeout = timeout
+        self.last_refresh = None
+        self.last_error = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start refreshing ahead of expiry in a background thread"""
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='credential-refresher', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop background refreshing"""
+        self._stop.set()
+
+    def seconds_left(self):
+        """Seconds until the access token expires (0 if there is none, None if unknown)"""
+        if not self.credentials.token:
+            return 0
+        if self.credentials.expiry is None:
+            return None
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        return (self.credentials.expiry - now).total_seconds()
+
+    def ensure_valid(self):
+        """Refresh inline only if the token is unusable (the background thread normally got there first)"""
+        if self.credentials.valid:
+            return
+        self.refresh(trigger='inline', only_if_invalid=True)
+
+    def refresh(self, trigger='background', only_if_invalid=False):
+        """Refresh the access token - one thread at a time, the others wait and reuse it"""
+        with self._lock:
+            # Another thread may have refreshed while we waited for the lock
+            if only_if_invalid and self.credentials.valid:
+                return
+
+            started = time.perf_counter()
+            outcome = 'error'
+            try:
+                with tracing.span('token_refresh'):
+                    request = google_auth_httplib2.Request(httplib2.Http(timeout=self.timeout))
+                    self.credentials.refresh(request)
+                outcome = 'ok'
+                self.last_refresh = time.time()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+                raise
+            finally:
+                metrics.token_refresh_latency.observe(time.perf_counter() - started)
+                metrics.token_refreshes.inc(trigger=trigger, outcome=outcome)
+
+            logger.info(f"🔑 Access token refreshed ({trigger}, {(time.perf_counter() - started) * 1000:.0f} ms)")
+
+            if self.on_refresh:
+                try:
+                    self.on_refresh(self.credentials)
+                except Exception as e:
+                    logger.warning(f"Failed to save refreshed credentials: {e}")
+
+    def _run(self):
+        """Refresh loop - sleeps until refresh_margin seconds before expiry"""
+        while not self._stop.is_set():
+            left = self.seconds_left()
+            if left is None:
+                # No expiry reported - nothing to schedule against
+                return
+
+            wait = left - self.refresh_margin
+            if wait > 0:
+                self._stop.wait(wait)
+                continue
+
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.warning(f"Background token refresh failed, retrying in 30s: {e}")
+                self._stop.wait(30)
+            else:
+                # Floor between refreshes in case Google hands out very short-lived tokens
+                self._stop.wait(60)
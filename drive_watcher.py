@@ -0,0 +1,125 @@
+# drive_watcher.py
+"""
+Background Drive Changes API watcher for AI Agent Manager
+Polls changes.list and reports edits, additions and removals in the agent folder
+"""
+
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+DOC_MIME_TYPE = 'application/vnd.google-apps.document'
+
+CHANGE_FIELDS = (
+    'nextPageToken, newStartPageToken, '
+    'changes(fileId, removed, file(id, name, mimeType, parents, trashed, modifiedTime, headRevisionId))'
+)
+
+class DriveChangesWatcher:
+    """Poll Drive changes.list from a saved page token in a daemon thread"""
+
+    def __init__(self, drive_service, folder_id, on_change, on_remove,
+                 interval=15, page_token=None, on_token=None):
+        self.drive_service = drive_service
+        self.folder_id = folder_id
+        self.on_change = on_change
+        self.on_remove = on_remove
+        self.on_token = on_token
+        self.interval = interval
+        self.page_token = page_token
+        self.last_poll = None
+        self.last_error = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start polling in a background thread"""
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='drive-changes-watcher', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop polling"""
+        self._stop.set()
+
+    def is_current(self):
+        """True if the last poll succeeded recently enough to trust local state"""
+        if self.last_poll is None or self.last_error:
+            return False
+        return time.monotonic() - self.last_poll < self.interval * 2 + 5
+
+    def poll(self):
+        """Fetch and dispatch all pending changes"""
+        if not self.page_token:
+            response = self.drive_service.changes().getStartPageToken().execute()
+            self._set_token(response['startPageToken'])
+
+        page_token = self.page_token
+        while page_token:
+            response = self.drive_service.changes().list(
+                pageToken=page_token,
+                pageSize=1000,
+                includeRemoved=True,
+                spaces='drive',
+                fields=CHANGE_FIELDS
+            ).execute()
+
+            for change in response.get('changes', []):
+                self._dispatch(change)
+
+            if 'newStartPageToken' in response:
+                self._set_token(response['newStartPageToken'])
+                break
+
+            page_token = response.get('nextPageToken')
+            self._set_token(page_token)
+
+        self.last_poll = time.monotonic()
+        self.last_error = None
+
+    def _dispatch(self, change):
+        """Route a single change to the removal or change callback"""
+        file_id = change.get('fileId')
+        file = change.get('file')
+
+        try:
+            if change.get('removed') or not file:
+                self.on_remove(file_id)
+                return
+
+            if file.get('mimeType') != DOC_MIME_TYPE:
+                return
+
+            in_folder = self.folder_id in file.get('parents', [])
+            if file.get('trashed') or not in_folder:
+                # Trashed or moved out of the agent folder
+                self.on_remove(file_id)
+            else:
+                self.on_change(file)
+        except Exception as e:
+            logger.error(f"Failed to apply Drive change for {file_id}: {e}")
+
+    def _set_token(self, token):
+        """Remember page token and hand it to the persistence callback"""
+        if token and token != self.page_token:
+            self.page_token = token
+            if self.on_token:
+                self.on_token(token)
+
+    def _run(self):
+        """Poll loop"""
+        logger.info(f"Drive changes watcher started (every {self.interval}s)")
+
+        while not self._stop.is_set():
+            try:
+                self.poll()
+            except Exception as e:
+                self.last_error = str(e)
+                logger.warning(f"Drive changes poll failed: {e}")
+
+            self._stop.wait(self.interval)
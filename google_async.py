@@ -0,0 +1,68 @@
+# google_async.py
+"""
+Async execution of Google API calls for AI Agent Manager
+Runs one shared asyncio event loop so a request handler can issue its independent
+Google calls concurrently (the handler's own thread still waits for the result)
+"""
+
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import metrics
+
+_loop = None
+_loop_thread = None
+_lock = threading.Lock()
+
+# Upper bound on threads blocked in googleapiclient at any one time
+max_workers = 16
+
+# key -> task for calls in flight (only touched on the loop thread, so no lock)
+_in_flight = {}
+
+def configure(workers):
+    """Set the Google call worker pool size (before the loop starts)"""
+    global max_workers
+    max_workers = workers
+
+def get_loop():
+    """Return the shared event loop, starting it on first use"""
+    global _loop, _loop_thread
+
+    with _lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            loop.set_default_executor(ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='google-call'))
+            _loop_thread = threading.Thread(target=loop.run_forever, name='google-async-loop', daemon=True)
+            _loop_thread.start()
+            _loop = loop
+        return _loop
+
+def run(coro, timeout=None):
+    """Run a coroutine on the shared loop from synchronous code and return its result"""
+    loop = get_loop()
+    if threading.current_thread() is _loop_thread:
+        raise RuntimeError("google_async.run() called from the event loop - await the coroutine instead")
+    return asyncio.run_coroutine_threadsafe(coro, loop).result(timeout)
+
+async def call(func, *args, **kwargs):
+    """Run a blocking function (e.g. a googleapiclient helper) on the worker pool"""
+    loop = asyncio.get_running_loop()
+    # Executor threads don't inherit context - carry the request's trace along
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(None, lambda: context.run(func, *args, **kwargs))
+
+async def single_flight(key, make_coro):
+    """Run make_coro() once per key at a time - concurrent callers await the same result"""
+    task = _in_flight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(make_coro())
+        _in_flight[key] = task
+        task.add_done_callback(lambda done: _in_flight.pop(key, None) if _in_flight.get(key) is done else None)
+    else:
+        metrics.single_flight_shared.inc(kind=key[0])
+
+    # Shield so one waiter timing out doesn't cancel the call for the others
+    return await asyncio.shield(task)
@@ -0,0 +1,256 @@
+# google_clients.py
+"""
+Thread-safe Google API clients for AI Agent Manager
+Builds Drive and Docs services whose HTTP transport is per-thread and kept alive
+"""
+
+import io
+import json
+import os
+import secrets
+import threading
+import time
+
+import google_auth_httplib2
+import httplib2
+from google.auth.exceptions import TransportError
+from googleapiclient import discovery_cache
+from googleapiclient.version import __version__ as GOOGLEAPICLIENT_VERSION
+from googleapiclient.discovery import build, build_from_document
+from googleapiclient.errors import HttpError
+from googleapiclient.http import HttpRequest, MediaIoBaseUpload
+
+import metrics
+import tracing
+from credential_manager import CredentialManager
+from resilience import RETRYABLE_STATUSES, IDEMPOTENT_METHODS, RetryPolicy, parse_retry_after
+
+# Network-level failures (no HTTP status) that are worth retrying
+TRANSIENT_ERRORS = (OSError, httplib2.HttpLib2Error, TransportError)
+
+DOC_MIME_TYPE = 'application/vnd.google-apps.document'
+
+# Every API method this app calls - the trimmed discovery docs keep only these
+DISCOVERY_METHODS = {
+    ('drive', 'v3'): {
+        'about': ['get'],
+        'changes': ['getStartPageToken', 'list'],
+        'files': ['get', 'list', 'export', 'create', 'update']
+    },
+    ('docs', 'v1'): {
+        'documents': ['get', 'create', 'batchUpdate']
+    }
+}
+
+DISCOVERY_CACHE_DIR = 'discovery-cache'
+
+class ManagedAuthorizedHttp(google_auth_httplib2.AuthorizedHttp):
+    """AuthorizedHttp that leaves token refresh to the shared CredentialManager"""
+
+    def __init__(self, credential_manager, http):
+        super().__init__(credential_manager.credentials, http=http)
+        self.credential_manager = credential_manager
+
+    def request(self, uri, method='GET', body=None, headers=None, **kwargs):
+        # Locked refresh, so concurrent threads don't all refresh an expired token
+        self.credential_manager.ensure_valid()
+        return super().request(uri, method=method, body=body, headers=headers, **kwargs)
+
+class TransportPool:
+    """Hands each thread its own authorized, keep-alive httplib2 transport"""
+
+    def __init__(self, credential_manager, timeout=60, retry=None):
+        self.credential_manager = credential_manager
+        self.timeout = timeout
+        self.retry = retry or RetryPolicy()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._created = 0
+
+    def get(self):
+        """Return the calling thread's transport, creating it on first use"""
+        # httplib2.Http is not thread-safe - never share one between threads
+        http = getattr(self._local, 'http', None)
+        if http is None:
+            http = ManagedAuthorizedHttp(
+                self.credential_manager,
+                http=httplib2.Http(timeout=self.timeout)
+            )
+            self._local.http = http
+            with self._lock:
+                self._created += 1
+        return http
+
+    def stats(self):
+        """Return number of transports created so far"""
+        with self._lock:
+            return {'transports': self._created}
+
+    def request_builder(self, http, *args, **kwargs):
+        """requestBuilder for build() - binds requests to the pool"""
+        request = PooledHttpRequest(self.get(), *args, **kwargs)
+        request.pool = self
+        return request
+
+class PooledHttpRequest(HttpRequest):
+    """HttpRequest that executes on the executing thread's transport"""
+
+    pool = None
+
+    def execute(self, http=None, num_retries=0):
+        """Execute on the current thread's transport, retrying transient failures of reads"""
+        if http is None and self.pool is not None:
+            http = self.pool.get()
+
+        method = self.methodId or 'unknown'
+        policy = self.pool.retry if self.pool is not None else None
+        if policy is None:
+            return self._execute_once(method, http, num_retries)
+
+        # The breaker counts calls, not attempts - one call's retries are one failure
+        policy.breaker.allow()
+
+        attempts = policy.max_attempts if self.method in IDEMPOTENT_METHODS else 1
+        deadline = policy.deadline()
+        for attempt in range(1, attempts + 1):
+            try:
+                result = self._execute_once(method, http, num_retries)
+            except HttpError as e:
+                if e.resp.status not in RETRYABLE_STATUSES:
+                    # Google answered (404, 403, ...) - it's up
+                    policy.breaker.record_success()
+                    raise
+                delay = policy.delay(attempt, parse_retry_after(e.resp.get('retry-after')), deadline)
+                if attempt == attempts or delay is None:
+                    policy.breaker.record_failure()
+                    raise
+                reason = str(e.resp.status)
+            except TRANSIENT_ERRORS as e:
+                delay = policy.delay(attempt, deadline=deadline)
+                if attempt == attempts or delay is None:
+                    policy.breaker.record_failure()
+                    raise
+                reason = type(e).__name__
+            except Exception:
+                # Google answered, the response just wasn't usable - don't hold the breaker
+                policy.breaker.record_success()
+                raise
+            else:
+                policy.breaker.record_success()
+                return result
+
+            metrics.google_retries.inc(method=method, reason=reason)
+            with tracing.span('retry_wait'):
+                time.sleep(delay)
+
+    def _execute_once(self, method, http, num_retries):
+        """Single attempt, timed and counted"""
+        status = 'error'
+        started = time.perf_counter()
+        try:
+            with tracing.span(method):
+                result = super().execute(http=http, num_retries=num_retries)
+            status = '200'
+            return result
+        except HttpError as e:
+            status = str(e.resp.status)
+            raise
+        finally:
+            metrics.google_latency.observe(time.perf_counter() - started, method=method)
+            metrics.google_calls.inc(method=method, status=status)
+
+def _schema_refs(node, found):
+    """Collect every $ref schema name used under a discovery node"""
+    if isinstance(node, dict):
+        for key, value in node.items():
+            if key == '$ref':
+                found.add(value)
+            else:
+                _schema_refs(value, found)
+    elif isinstance(node, list):
+        for value in node:
+            _schema_refs(value, found)
+
+def trim_discovery(doc, methods):
+    """Reduce a discovery doc to the given {resource: [method, ...]}"""
+    trimmed = {key: value for key, value in doc.items() if key not in ('resources', 'schemas', 'icons', 'description')}
+    trimmed['resources'] = {
+        resource: {'methods': {name: doc['resources'][resource]['methods'][name] for name in names}}
+        for resource, names in methods.items()
+    }
+
+    # Schemas only feed generated docstrings - keep the names, drop the bodies
+    names = set()
+    _schema_refs(trimmed['resources'], names)
+    trimmed['schemas'] = {name: {'id': name, 'type': 'object'} for name in names}
+    return trimmed
+
+def load_trimmed_discovery(service, version, cache_dir=None):
+    """Return the trimmed discovery doc, from the on-disk cache when it is still current"""
+    cache_dir = cache_dir or DISCOVERY_CACHE_DIR
+    methods = DISCOVERY_METHODS[(service, version)]
+    # Regenerate when the client library or the method list changes
+    stamp = f"{GOOGLEAPICLIENT_VERSION}:{json.dumps(methods, sort_keys=True)}"
+    path = os.path.join(cache_dir, f"{service}.{version}.json")
+
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            doc = json.load(f)
+        if doc.get('x-trimmed-for') == stamp:
+            return doc
+    except (OSError, ValueError):
+        pass
+
+    doc = trim_discovery(json.loads(discovery_cache.get_static_doc(service, version)), methods)
+    doc['x-trimmed-for'] = stamp
+
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        # Per-process temp name - gunicorn workers all trim on their first start
+        tmp_path = f"{path}.{secrets.token_hex(4)}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(doc, f)
+        os.replace(tmp_path, path)
+    except OSError:
+        # Read-only install - trim again next start
+        pass
+    return doc
+
+def point_discovery_at(doc, api_root):
+    """Copy of a discovery doc whose calls (including uploads and batches) go to api_root"""
+    api_root = api_root.rstrip('/') + '/'
+    return {**doc, 'rootUrl': api_root, 'mtlsRootUrl': api_root, 'baseUrl': api_root + doc['servicePath']}
+
+def build_services(credentials, timeout=60, retry=None, credential_manager=None, discovery='trimmed', api_root=None):
+    """Build Drive v3 and Docs v1 services sharing one transport pool, retry policy and credentials"""
+    credential_manager = credential_manager or CredentialManager(credentials, timeout=timeout)
+    pool = TransportPool(credential_manager, timeout=timeout, retry=RetryPolicy(retry))
+
+    services = []
+    for service, version in (('drive', 'v3'), ('docs', 'v1')):
+        if discovery == 'trimmed':
+            doc = load_trimmed_discovery(service, version)
+        elif api_root:
+            doc = json.loads(discovery_cache.get_static_doc(service, version))
+        else:
+            # Full bundled discovery docs - every method, larger and slower to build
+            services.append(build(service, version, http=pool.get(), requestBuilder=pool.request_builder))
+            continue
+
+        if api_root:
+            # e.g. the local stand-in server in benchmarks/fake_google.py
+            doc = point_discovery_at(doc, api_root)
+        services.append(build_from_document(doc, http=pool.get(), requestBuilder=pool.request_builder))
+
+    drive, docs = services
+    return drive, docs, pool
+
+def create_doc(drive, name, text, parent_id=None, fields='id, name, modifiedTime'):
+    """Create a Google Doc with content in one call (plain text upload converted by Drive)"""
+    body = {'name': name, 'mimeType': DOC_MIME_TYPE}
+    if parent_id:
+        body['parents'] = [parent_id]
+
+    media = MediaIoBaseUpload(io.BytesIO(text.encode('utf-8')), mimetype='text/plain', resumable=False)
+
+    return drive.files().create(body=body, media_body=media, fields=fields).execute()
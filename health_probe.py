@@ -0,0 +1,76 @@
+# health_probe.py
+"""
+Background health prober for AI Agent Manager
+Runs dependency checks (Drive, ngrok) on an interval so /health can answer
+from a cached snapshot instead of calling Google on every request
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+class HealthProber:
+    """Run named checks in a daemon thread and keep their latest results"""
+
+    def __init__(self, checks, interval=60):
+        # checks: name -> callable returning a status string (raising means down)
+        self.checks = checks
+        self.interval = interval
+        self._results = {
+            name: {'status': 'unknown', 'latency_ms': None, 'checked_at': None, 'last_error': None}
+            for name in checks
+        }
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start probing in a background thread"""
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='health-prober', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop probing"""
+        self._stop.set()
+
+    def probe(self):
+        """Run every check now and record the results"""
+        for name, check in self.checks.items():
+            started = time.perf_counter()
+            try:
+                status = check() or 'ok'
+                error = None
+            except Exception as e:
+                status = 'disconnected'
+                error = str(e)
+                logger.warning(f"Health probe '{name}' failed: {e}")
+
+            result = {
+                'status': status,
+                'latency_ms': round((time.perf_counter() - started) * 1000, 1),
+                'checked_at': datetime.now(timezone.utc).isoformat(timespec='seconds')
+            }
+            with self._lock:
+                # Keep the last error visible after recovery
+                result['last_error'] = error or self._results[name]['last_error']
+                self._results[name] = result
+
+    def snapshot(self):
+        """Return a copy of the latest results"""
+        with self._lock:
+            return {name: dict(result) for name, result in self._results.items()}
+
+    def _run(self):
+        """Probe loop"""
+        logger.info(f"Health prober started (every {self.interval}s)")
+
+        while not self._stop.is_set():
+            self.probe()
+            self._stop.wait(self.interval)
@@ -0,0 +1,108 @@
+# http_cache.py
+"""
+HTTP response caching helpers for AI Agent Manager
+Pre-encoded JSON bodies with strong ETags, 304 handling and gzip/brotli compression
+"""
+
+import gzip
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+from flask import Response, request
+
+# Optional - brotli is used when installed and the client accepts it
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Bodies smaller than this aren't worth compressing
+MIN_COMPRESS_BYTES = 512
+
+class EncodedBody:
+    """A serialized JSON body with its ETag and lazily built compressed variants"""
+
+    def __init__(self, payload):
+        # Same bytes jsonify would produce
+        self.identity = (json.dumps(payload, sort_keys=True, separators=(',', ':')) + '\n').encode('utf-8')
+        self.etag = hashlib.sha256(self.identity).hexdigest()[:32]
+        self._variants = {}
+        self._lock = threading.Lock()
+
+    def variant(self, encoding):
+        """Return the body bytes for a content coding ('identity', 'gzip' or 'br')"""
+        if encoding == 'identity':
+            return self.identity
+
+        with self._lock:
+            data = self._variants.get(encoding)
+            if data is None:
+                if encoding == 'br':
+                    data = brotli.compress(self.identity, quality=5)
+                else:
+                    data = gzip.compress(self.identity, compresslevel=6)
+                self._variants[encoding] = data
+            return data
+
+    def etag_for(self, encoding):
+        """Strong ETag of one representation (each coding gets its own)"""
+        return self.etag if encoding == 'identity' else f"{self.etag}-{encoding}"
+
+class BodyCache:
+    """Bounded LRU of encoded bodies keyed by (resource, version)"""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_build(self, key, build_payload):
+        """Return the cached body for key, serializing build_payload() on a miss"""
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+                return body
+
+        body = EncodedBody(build_payload())
+
+        with self._lock:
+            self._entries[key] = body
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return body
+
+def choose_encoding(body):
+    """Pick the best content coding the client accepts"""
+    if len(body.identity) < MIN_COMPRESS_BYTES:
+        return 'identity'
+
+    candidates = ['br', 'gzip'] if brotli else ['gzip']
+    return request.accept_encodings.best_match(candidates) or 'identity'
+
+def encoded_response(body, status=200):
+    """Serve an EncodedBody, honouring If-None-Match and Accept-Encoding"""
+    encoding = choose_encoding(body)
+    etag = body.etag_for(encoding)
+
+    headers = {
+        'Vary': 'Accept-Encoding, Authorization',
+        'Cache-Control': 'private, no-cache'
+    }
+
+    # Any representation of the same body counts as a match
+    known = (body.etag, body.etag_for('gzip'), body.etag_for('br'))
+    if request.method == 'GET' and any(request.if_none_match.contains_weak(tag) for tag in known):
+        response = Response(status=304, headers=headers)
+        response.set_etag(etag)
+        return response
+
+    if encoding != 'identity':
+        headers['Content-Encoding'] = encoding
+
+    response = Response(body.variant(encoding), status=status, mimetype='application/json', headers=headers)
+    response.set_etag(etag)
+    return response
@@ -2,15 +2,25 @@
 """
 Initialize Google Drive structure
 Creates folders, starter agents, and registry doc
+(or, with --local, starter agents in a local directory)
 """
 
 from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
+import argparse
 import json
 import sys
 import os
-import win32crypt
+
+from google_clients import build_services, create_doc
+from agent_backends import DriveBackend, LocalBackend
+
+STARTER_AGENTS = [
+    ('Agent Builder', 'agent_builder'),
+    ('Sales Email Writer', 'sales_agent'),
+    ('Technical Documentation', 'technical_agent'),
+    ('Customer Support', 'support_agent')
+]
 
 def load_template(template_name):
     """Load agent template from templates folder"""
@@ -43,6 +53,8 @@ Describe how the agent should format responses.
 def decrypt_credentials(encrypted_data):
     """Decrypt credentials using Windows DPAPI"""
     try:
+        import win32crypt
+
         # CryptUnprotectData returns (description, decrypted_bytes) tuple
         description, decrypted_bytes = win32crypt.CryptUnprotectData(encrypted_data, None, None, None, 0)
         return decrypted_bytes.decode('utf-8')
@@ -81,48 +93,63 @@ def load_credentials():
         print(f"❌ Error loading credentials: {e}")
         return None
 
-def create_starter_agent(docs, drive, folder_id, agent_name, template_name):
-    """Create a starter agent doc with template content"""
+def create_starter_agent(backend, agent_name, template_name):
+    """Create a starter agent with template content in the given storage backend"""
     try:
-        # Create doc
-        doc = docs.documents().create(body={
-            'title': agent_name
-        }).execute()
-
-        doc_id = doc['documentId']
-
         # Load template content
         content = load_template(template_name)
 
-        # Write content to doc
-        docs.documents().batchUpdate(
-            documentId=doc_id,
-            body={
-                'requests': [{
-                    'insertText': {
-                        'location': {'index': 1},
-                        'text': content
-                    }
-                }]
-            }
-        ).execute()
-
-        # Move to agents folder
-        drive.files().update(
-            fileId=doc_id,
-            addParents=folder_id,
-            fields='id, parents'
-        ).execute()
+        # Create agent with its content
+        doc = backend.create(agent_name, content)
+        doc_id = doc['id']
 
         print(f"   ✅ Created: {agent_name}")
         return doc_id
 
-    except HttpError as e:
+    except (HttpError, OSError) as e:
         print(f"   ❌ Failed to create {agent_name}: {e}")
         return None
 
+def init_local(directory):
+    """Create starter agents in a local directory and point config.json at it"""
+    backend = LocalBackend(directory)
+    print(f"🤖 Creating starter agents in {backend.directory}...")
+
+    for agent_name, template_name in STARTER_AGENTS:
+        create_starter_agent(backend, agent_name, template_name)
+
+    # Keep any existing settings (API key, server options) - only storage changes
+    config = {}
+    if os.path.exists('config.json'):
+        with open('config.json', 'r', encoding='utf-8') as f:
+            config = json.load(f)
+    config['storage'] = {'backend': 'local', 'directory': directory}
+    config.setdefault('agent_folder_name', 'Local agents')
+    config.setdefault('version', '1.0.0')
+
+    with open('config.json', 'w', encoding='utf-8') as f:
+        json.dump(config, f, indent=2)
+
+    print()
+    print("=" * 60)
+    print("✅ Local agent setup complete!")
+    print("=" * 60)
+    print()
+    print(f"📁 Agents folder: {backend.directory}")
+    print("💡 Each agent is a markdown file - edit it and the server picks up the change")
+    print()
+    return 0
+
 def main():
     """Initialize Google Drive folder structure"""
+    parser = argparse.ArgumentParser(description='Create the agent folders, starter agents and config.json')
+    parser.add_argument('--local', nargs='?', const='agents', metavar='DIRECTORY',
+                        help='Store agents as markdown files in DIRECTORY (default: agents) instead of Google Drive')
+    args = parser.parse_args()
+
+    if args.local:
+        return init_local(args.local)
+
     try:
         # Load credentials
         creds = load_credentials()
@@ -130,9 +157,8 @@ def main():
             print("❌ ERROR: Failed to load credentials")
             return 1
 
-        # Build services
-        drive = build('drive', 'v3', credentials=creds)
-        docs = build('docs', 'v1', credentials=creds)
+        # Build services (same retrying, circuit-broken transport as the server)
+        drive, _, _ = build_services(creds)
 
         print("📁 Creating folder structure in Google Drive...")
         print()
@@ -159,20 +185,8 @@ def main():
         # Create registry doc
         print()
         print("📄 Creating agent registry...")
-        registry = docs.documents().create(body={
-            'title': 'Agent Registry'
-        }).execute()
 
-        registry_id = registry['documentId']
-
-        # Move registry to main folder
-        drive.files().update(
-            fileId=registry_id,
-            addParents=main_folder_id,
-            fields='id, parents'
-        ).execute()
-
-        # Write initial registry content
+        # Initial registry content
         registry_content = """AGENT REGISTRY
 Last Updated: Auto-generated
 
@@ -213,17 +227,9 @@ To create a new agent manually, tell your ChatGPT: "Create a new agent for [purp
 To edit an agent, open its document in Google Drive and make changes.
 """
 
-        docs.documents().batchUpdate(
-            documentId=registry_id,
-            body={
-                'requests': [{
-                    'insertText': {
-                        'location': {'index': 1},
-                        'text': registry_content
-                    }
-                }]
-            }
-        ).execute()
+        # Create registry in main folder with its content
+        registry = create_doc(drive, 'Agent Registry', registry_content, parent_id=main_folder_id)
+        registry_id = registry['id']
 
         print(f"✅ Created agent registry")
 
@@ -231,15 +237,9 @@ To edit an agent, open its document in Google Drive and make changes.
         print()
         print("🤖 Creating starter agents...")
 
-        starter_agents = [
-            ('Agent Builder', 'agent_builder'),
-            ('Sales Email Writer', 'sales_agent'),
-            ('Technical Documentation', 'technical_agent'),
-            ('Customer Support', 'support_agent')
-        ]
-
-        for agent_name, template_name in starter_agents:
-            create_starter_agent(docs, drive, agents_folder_id, agent_name, template_name)
+        backend = DriveBackend(drive, None, agents_folder_id)
+        for agent_name, template_name in STARTER_AGENTS:
+            create_starter_agent(backend, agent_name, template_name)
 
         # Get user's email
         about = drive.about().get(fields='user').execute()
@@ -0,0 +1,168 @@
+# logging_setup.py
+"""
+Logging configuration for AI Agent Manager
+Request threads only enqueue records; a background listener thread does the
+file and console writes. Optional JSON lines and sampling of chatty info logs
+"""
+
+import atexit
+import copy
+import json
+import logging
+import queue
+import random
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+import tracing
+
+# Overridden by the "logging" section of config.json
+LOG_DEFAULTS = {
+    'file': 'agent-server.log',
+    'max_bytes': 10 * 1024 * 1024,
+    'backup_count': 5,
+    'format': 'text',
+    'level': 'INFO',
+    # Message prefix -> fraction of matching INFO lines to keep
+    'sample': {}
+}
+
+# Per-request span lines go to this logger, and from the queue to the trace log only
+TRACE_LOGGER = 'agent.trace'
+trace_logger = logging.getLogger(TRACE_LOGGER)
+
+TEXT_FORMAT = '%(asctime)s - %(levelname)s - [%(trace_id)s] %(message)s'
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+_listener = None
+_queue_handler = None
+_traceback_formatter = logging.Formatter()
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line"""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'trace_id': getattr(record, 'trace_id', '-'),
+            'message': record.getMessage()
+        }
+        # Rendered before queuing by TracebackQueueHandler.prepare
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        if record.stack_info:
+            entry['stack'] = record.stack_info
+        return json.dumps(entry, ensure_ascii=False)
+
+class TracebackQueueHandler(QueueHandler):
+    """QueueHandler that keeps tracebacks out of the message so formatters can place them"""
+
+    def prepare(self, record):
+        # The stock prepare() folds exc_text into msg, leaving nothing for JsonFormatter
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            # Render now - traceback objects pin request frames while queued
+            record.exc_text = _traceback_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+class LoggerFilter(logging.Filter):
+    """Pass records from one logger only, or everything but it (exclude=True)"""
+
+    def __init__(self, name, exclude=False):
+        super().__init__()
+        self.logger_name = name
+        self.exclude = exclude
+
+    def filter(self, record):
+        return (record.name == self.logger_name) != self.exclude
+
+class SamplingFilter(logging.Filter):
+    """Keep only a fraction of high-volume INFO lines, matched by message prefix"""
+
+    def __init__(self, rates):
+        super().__init__()
+        self.rates = {prefix: float(rate) for prefix, rate in rates.items()}
+
+    def filter(self, record):
+        if record.levelno > logging.INFO or not self.rates:
+            return True
+
+        message = record.getMessage()
+        for prefix, rate in self.rates.items():
+            if message.startswith(prefix):
+                return random.random() < rate
+        return True
+
+def setup_logging(settings=None, trace_log=None):
+    """Configure (or reconfigure) root logging through a queue and background writer"""
+    global _listener, _queue_handler
+
+    settings = {**LOG_DEFAULTS, **(settings or {})}
+    root = logging.getLogger()
+
+    # Reconfiguring: flush and retire the previous writer first
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        root.removeHandler(_queue_handler)
+
+    if settings['format'] == 'json':
+        formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter(TEXT_FORMAT, datefmt=DATE_FORMAT)
+
+    # File handler with rotation
+    file_handler = RotatingFileHandler(
+        settings['file'],
+        maxBytes=settings['max_bytes'],
+        backupCount=settings['backup_count'],
+        encoding='utf-8'
+    )
+    file_handler.setFormatter(formatter)
+
+    # Console handler with UTF-8 encoding for Windows compatibility
+    console_handler = logging.StreamHandler()
+    # Configure stream to use UTF-8 and replace unmappable characters
+    if hasattr(console_handler.stream, 'reconfigure'):
+        console_handler.stream.reconfigure(encoding='utf-8', errors='replace')
+    console_handler.setFormatter(formatter)
+
+    handlers = [file_handler, console_handler]
+    for handler in handlers:
+        handler.addFilter(LoggerFilter(TRACE_LOGGER, exclude=True))
+
+    # Request span log - already JSON, written as-is by the same background thread
+    if trace_log:
+        trace_handler = logging.FileHandler(trace_log, encoding='utf-8')
+        trace_handler.setFormatter(logging.Formatter('%(message)s'))
+        trace_handler.addFilter(LoggerFilter(TRACE_LOGGER))
+        handlers.append(trace_handler)
+    # Traces are wanted whatever the configured level
+    trace_logger.setLevel(logging.INFO if trace_log else logging.CRITICAL + 1)
+
+    # Stamp trace IDs on the request thread before queuing - the listener thread has no request context
+    _queue_handler = TracebackQueueHandler(queue.SimpleQueue())
+    _queue_handler.addFilter(tracing.TraceIdFilter())
+    _queue_handler.addFilter(SamplingFilter(settings['sample']))
+
+    _listener = QueueListener(_queue_handler.queue, *handlers)
+    _listener.start()
+
+    root.setLevel(settings['level'])
+    root.addHandler(_queue_handler)
+    return root
+
+def shutdown_logging():
+    """Flush queued records and stop the writer thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+atexit.register(shutdown_logging)
@@ -0,0 +1,151 @@
+# metrics.py
+"""
+In-process metrics for AI Agent Manager
+Counters and histograms rendered in the Prometheus text exposition format
+"""
+
+import threading
+from bisect import bisect_left
+
+# Latency buckets in seconds (Google calls and requests share them)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+def _escape(value):
+    """Escape a label value for the exposition format"""
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _format_labels(names, values, extra=None):
+    """Render {name="value",...} (empty string if no labels)"""
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+def _format_value(value):
+    """Render a sample value (integers without a trailing .0)"""
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+class Counter:
+    """Monotonic counter with labels"""
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        """Add amount to the series for these label values"""
+        key = tuple(labels.get(name, '') for name in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        """Exposition lines for this counter"""
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} counter']
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f'{self.name}{_format_labels(self.labels, key)} {_format_value(value)}')
+        return lines
+
+class Histogram:
+    """Cumulative-bucket histogram with labels"""
+
+    def __init__(self, name, documentation, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        """Record one observation for these label values"""
+        key = tuple(labels.get(name, '') for name in self.labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # Per-bucket counts (last slot is +Inf), sum
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self):
+        """Exposition lines for this histogram"""
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            for key, (counts, total) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float('inf'),), counts):
+                    cumulative += count
+                    le = '+Inf' if bound == float('inf') else _format_value(bound)
+                    labels = _format_labels(self.labels, key, 'le="' + le + '"')
+                    lines.append(f'{self.name}_bucket{labels} {cumulative}')
+                lines.append(f'{self.name}_sum{_format_labels(self.labels, key)} {_format_value(total)}')
+                lines.append(f'{self.name}_count{_format_labels(self.labels, key)} {cumulative}')
+        return lines
+
+class Registry:
+    """Collection of metrics rendered together"""
+
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        """Add a metric and return it"""
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        """Full exposition document"""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+registry = Registry()
+
+http_requests = registry.register(Counter(
+    'agent_http_requests_total', 'HTTP requests by route, method and status code',
+    labels=('route', 'method', 'status')
+))
+http_latency = registry.register(Histogram(
+    'agent_http_request_duration_seconds', 'HTTP request latency by route',
+    labels=('route',)
+))
+rate_limited = registry.register(Counter(
+    'agent_rate_limited_total', 'Requests rejected by the rate limiter',
+    labels=('route',)
+))
+google_calls = registry.register(Counter(
+    'agent_google_api_calls_total', 'Google API calls by method and outcome',
+    labels=('method', 'status')
+))
+google_latency = registry.register(Histogram(
+    'agent_google_api_duration_seconds', 'Google API call latency by method',
+    labels=('method',)
+))
+google_retries = registry.register(Counter(
+    'agent_google_api_retries_total', 'Google API call retries by method and reason',
+    labels=('method', 'reason')
+))
+google_circuit_transitions = registry.register(Counter(
+    'agent_google_circuit_transitions_total', 'Google API circuit breaker state changes',
+    labels=('state',)
+))
+google_circuit_rejections = registry.register(Counter(
+    'agent_google_circuit_rejections_total', 'Google API calls failed fast by the open circuit breaker'
+))
+single_flight_shared = registry.register(Counter(
+    'agent_single_flight_shared_total', 'Requests that joined an identical in-flight upstream fetch',
+    labels=('kind',)
+))
+token_refreshes = registry.register(Counter(
+    'agent_token_refreshes_total', 'OAuth access token refreshes by trigger and outcome',
+    labels=('trigger', 'outcome')
+))
+token_refresh_latency = registry.register(Histogram(
+    'agent_token_refresh_duration_seconds', 'OAuth access token refresh latency'
+))
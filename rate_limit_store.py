@@ -0,0 +1,117 @@
+# rate_limit_store.py
+"""
+Shared rate limit storage for AI Agent Manager
+SQLite backend for flask-limiter so every worker process on the host
+enforces one budget, with expired windows purged as it goes
+"""
+
+import os
+import sqlite3
+import threading
+import time
+
+from limits.storage import Storage
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS limits (
+    key TEXT PRIMARY KEY,
+    count INTEGER NOT NULL,
+    expires_at REAL NOT NULL
+);
+"""
+
+# Expired windows are deleted every this many increments
+PURGE_EVERY = 200
+
+class SQLiteStorage(Storage):
+    """Fixed-window rate limit counters in a local SQLite file (sqlite:///path)"""
+
+    STORAGE_SCHEME = ['sqlite']
+
+    def __init__(self, uri=None, **options):
+        super().__init__(uri, **options)
+        self.path = uri.split('://', 1)[1][1:] if uri else 'rate-limits.db'
+        self._local = threading.local()
+        self._increments = 0
+        # Own lock - limits 4+ no longer gives Storage one
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(SCHEMA)
+
+    @property
+    def base_exceptions(self):
+        return sqlite3.Error
+
+    def _connect(self):
+        """Return this thread's connection (reopened after a fork)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            # isolation_level=None so BEGIN IMMEDIATE is under our control
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def incr(self, key, expiry, elastic_expiry=False, amount=1):
+        """Add amount to key's window, starting a new window if it expired"""
+        conn = self._connect()
+        now = time.time()
+
+        # Take the write lock up front so concurrent workers can't lose increments
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute('SELECT count, expires_at FROM limits WHERE key = ?', (key,)).fetchone()
+            if row is None or row[1] <= now:
+                count, expires_at = amount, now + expiry
+            else:
+                count = row[0] + amount
+                expires_at = now + expiry if elastic_expiry else row[1]
+            conn.execute(
+                'INSERT OR REPLACE INTO limits (key, count, expires_at) VALUES (?, ?, ?)',
+                (key, count, expires_at)
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+        with self._lock:
+            self._increments += 1
+            due = self._increments % PURGE_EVERY == 0
+        if due:
+            self.purge()
+
+        return count
+
+    def get(self, key):
+        """Current count for key (0 if its window expired)"""
+        row = self._connect().execute(
+            'SELECT count FROM limits WHERE key = ? AND expires_at > ?', (key, time.time())
+        ).fetchone()
+        return row[0] if row else 0
+
+    def get_expiry(self, key):
+        """Epoch second at which key's window resets"""
+        row = self._connect().execute('SELECT expires_at FROM limits WHERE key = ?', (key,)).fetchone()
+        return int(row[0] if row else time.time())
+
+    def check(self):
+        """True if the database is reachable"""
+        try:
+            self._connect().execute('SELECT 1').fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def reset(self):
+        """Clear all counters, returns number removed"""
+        return self._connect().execute('DELETE FROM limits').rowcount
+
+    def clear(self, key):
+        """Clear one key's counter"""
+        self._connect().execute('DELETE FROM limits WHERE key = ?', (key,))
+
+    def purge(self):
+        """Delete expired windows so the table only holds live keys"""
+        return self._connect().execute('DELETE FROM limits WHERE expires_at <= ?', (time.time(),)).rowcount
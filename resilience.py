@@ -0,0 +1,132 @@
+# resilience.py
+"""
+Retry and circuit breaker policy for Google API calls in AI Agent Manager
+Idempotent reads are retried with jittered exponential backoff (honouring
+Retry-After); a breaker fails fast while Google keeps failing
+"""
+
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import metrics
+
+# Overridden by the "google_retries" section of config.json
+RETRY_DEFAULTS = {
+    'max_attempts': 4,
+    'base_delay': 0.5,
+    'max_delay': 8,
+    'max_retry_after': 30,
+    'max_retry_time': 5,
+    'breaker_threshold': 5,
+    'breaker_reset': 30
+}
+
+# Statuses worth retrying (Google's "try again later")
+RETRYABLE_STATUSES = (429, 500, 502, 503, 504)
+
+# Only these HTTP methods are retried - a repeated create could duplicate a doc
+IDEMPOTENT_METHODS = ('GET', 'HEAD')
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling Google while the circuit breaker is open"""
+
+    def __init__(self, retry_in):
+        super().__init__(f"Google API circuit open, retry in {retry_in:.0f}s")
+        self.retry_in = retry_in
+
+class CircuitBreaker:
+    """Opens after consecutive failures, lets one probe call through after a cool-down"""
+
+    def __init__(self, threshold=5, reset_timeout=30):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.state = 'closed'
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Raise CircuitOpenError if calls should fail fast right now"""
+        with self._lock:
+            if self.state == 'closed':
+                return
+
+            waited = time.monotonic() - self._opened_at
+            if self.state == 'open' and waited >= self.reset_timeout:
+                self._set_state('half_open')
+
+            if self.state == 'half_open' and not self._probing:
+                # One trial call decides whether to close again
+                self._probing = True
+                return
+
+        metrics.google_circuit_rejections.inc()
+        raise CircuitOpenError(max(self.reset_timeout - waited, 0))
+
+    def record_success(self):
+        """Google answered - reset the failure count"""
+        with self._lock:
+            self._failures = 0
+            self._probing = False
+            if self.state != 'closed':
+                self._set_state('closed')
+
+    def record_failure(self):
+        """Google failed or was unreachable"""
+        with self._lock:
+            self._failures += 1
+            self._probing = False
+            if self.state == 'half_open' or (self.state == 'closed' and self._failures >= self.threshold):
+                self._opened_at = time.monotonic()
+                self._set_state('open')
+
+    def _set_state(self, state):
+        """Transition and count it (lock held)"""
+        self.state = state
+        metrics.google_circuit_transitions.inc(state=state)
+
+class RetryPolicy:
+    """Backoff settings for one set of services"""
+
+    def __init__(self, settings=None):
+        settings = {**RETRY_DEFAULTS, **(settings or {})}
+        self.max_attempts = max(1, int(settings['max_attempts']))
+        self.base_delay = settings['base_delay']
+        self.max_delay = settings['max_delay']
+        self.max_retry_after = settings['max_retry_after']
+        self.max_retry_time = settings['max_retry_time']
+        self.breaker = CircuitBreaker(settings['breaker_threshold'], settings['breaker_reset'])
+
+    def deadline(self):
+        """Monotonic time after which a call stops retrying"""
+        return time.monotonic() + self.max_retry_time
+
+    def delay(self, attempt, retry_after=None, deadline=None):
+        """Seconds to wait before retry number attempt (1-based), or None to give up now"""
+        remaining = deadline - time.monotonic() if deadline is not None else float('inf')
+        if retry_after is not None:
+            # Google asked for a longer wait than the caller can afford - fail fast
+            # so the 503 passes Retry-After on instead of holding a request thread
+            if retry_after > min(remaining, self.max_retry_after):
+                return None
+            return retry_after
+        if remaining <= 0:
+            return None
+        # Full jitter keeps concurrent callers from retrying in lockstep
+        return min(random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1))), remaining)
+
+def parse_retry_after(value):
+    """Retry-After header as seconds (delta-seconds or HTTP date), or None"""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0)
+    except (TypeError, ValueError):
+        return None
@@ -2,14 +2,40 @@
 """
 Test script to verify server is working correctly
 Checks all components: server, Google Drive, ngrok, agents
+With --load, runs the agent checks concurrently as a load test
 """
 
+import argparse
+import functools
 import requests
+from requests.adapters import HTTPAdapter
 import json
+import random
+import threading
 import time
 import sys
 from pathlib import Path
 
+SERVER_URL = 'http://localhost:3000'
+
+# Checks print their results unless running as load-test workloads
+verbose = True
+
+def say(*args):
+    """Print unless quiet"""
+    if verbose:
+        print(*args)
+
+@functools.lru_cache(maxsize=None)
+def auth_headers():
+    """Authorization header with the API key from config.json, if there is one"""
+    try:
+        with open('config.json', 'r', encoding='utf-8') as f:
+            api_key = json.load(f).get('api_key')
+    except (OSError, ValueError):
+        api_key = None
+    return {'Authorization': f'Bearer {api_key}'} if api_key else {}
+
 def print_header(text):
     """Print formatted header"""
     print()
@@ -21,9 +47,9 @@ def print_header(text):
 def print_test(name, passed, details=""):
     """Print test result"""
     status = "✅" if passed else "❌"
-    print(f"{status} {name}")
+    say(f"{status} {name}")
     if details:
-        print(f"   {details}")
+        say(f"   {details}")
 
 def test_files_exist():
     """Test that required files exist"""
@@ -51,12 +77,13 @@ def test_server_running():
     print("Checking server status...")
 
     try:
-        response = requests.get('http://localhost:3000/health', timeout=5)
+        response = requests.get(f'{SERVER_URL}/health', headers=auth_headers(), timeout=5)
 
         if response.status_code == 200:
             data = response.json()
             print_test("Server is running", True)
-            print_test("Google Drive connected", data.get('google_drive') == 'connected')
+            if data.get('storage') != 'local':
+                print_test("Google Drive connected", data.get('google_drive') == 'connected')
 
             # Print server info
             print()
@@ -83,13 +110,13 @@ def test_server_running():
         print_test("Server is running", False, str(e))
         return False, None
 
-def test_agents():
+def test_agents(session=requests):
     """Test agent listing"""
-    print()
-    print("Checking agents...")
+    say()
+    say("Checking agents...")
 
     try:
-        response = requests.get('http://localhost:3000/agents', timeout=10)
+        response = session.get(f'{SERVER_URL}/agents', headers=auth_headers(), timeout=10)
 
         if response.status_code == 200:
             data = response.json()
@@ -103,15 +130,15 @@ def test_agents():
                       f"Expected at least {expected_count} starter agents")
 
             if agents:
-                print()
-                print("Available agents:")
+                say()
+                say("Available agents:")
                 for agent in agents:
-                    print(f"   - {agent['name']} (ID: {agent['id'][:20]}...)")
+                    say(f"   - {agent['name']} (ID: {agent['id'][:20]}...)")
 
                 # Check for Agent Builder specifically
                 agent_names = [a['name'] for a in agents]
                 has_agent_builder = 'Agent Builder' in agent_names
-                print()
+                say()
                 print_test("Agent Builder found", has_agent_builder,
                           "This agent helps create new agents")
 
@@ -124,38 +151,38 @@ def test_agents():
         print_test("List agents", False, str(e))
         return False
 
-def test_agent_load():
-    """Test loading an agent"""
-    print()
-    print("Testing agent load...")
+def test_agent_load(session=requests, agent_id=None):
+    """Test loading an agent (the first listed one unless agent_id is given)"""
+    say()
+    say("Testing agent load...")
 
     try:
-        # Get first agent
-        response = requests.get('http://localhost:3000/agents', timeout=10)
-        if response.status_code != 200:
-            print_test("Load agent", False, "Couldn't list agents")
-            return False
+        if agent_id is None:
+            # Get first agent
+            response = session.get(f'{SERVER_URL}/agents', headers=auth_headers(), timeout=10)
+            if response.status_code != 200:
+                print_test("Load agent", False, "Couldn't list agents")
+                return False
 
-        agents = response.json().get('agents', [])
-        if not agents:
-            print_test("Load agent", False, "No agents available to test")
-            return False
+            agents = response.json().get('agents', [])
+            if not agents:
+                print_test("Load agent", False, "No agents available to test")
+                return False
 
-        test_agent = agents[0]
-        agent_id = test_agent['id']
+            agent_id = agents[0]['id']
 
         # Load the agent
-        response = requests.get(f'http://localhost:3000/agents/{agent_id}', timeout=10)
+        response = session.get(f'{SERVER_URL}/agents/{agent_id}', headers=auth_headers(), timeout=10)
 
         if response.status_code == 200:
             data = response.json()
             has_prompt = bool(data.get('prompt'))
 
-            print_test(f"Load agent: {test_agent['name']}", has_prompt)
+            print_test(f"Load agent: {data.get('name')}", has_prompt)
 
             if has_prompt:
                 prompt_preview = data['prompt'][:100].replace('\n', ' ')
-                print(f"   Prompt preview: {prompt_preview}...")
+                say(f"   Prompt preview: {prompt_preview}...")
 
             return has_prompt
         else:
@@ -166,6 +193,149 @@ def test_agent_load():
         print_test("Load agent", False, str(e))
         return False
 
+# Load-test workloads: name -> check(session, agent_ids)
+LOAD_WORKLOADS = {
+    'agents': lambda session, agent_ids: test_agents(session),
+    'agent_load': lambda session, agent_ids: test_agent_load(session, random.choice(agent_ids))
+}
+
+def parse_mix(text):
+    """Parse a request mix like "agents=1,agent_load=3" into {workload: weight}"""
+    mix = {}
+    for item in text.split(','):
+        name, _, weight = item.partition('=')
+        name = name.strip()
+        if name not in LOAD_WORKLOADS:
+            raise argparse.ArgumentTypeError(f"unknown workload '{name}' (choose from {', '.join(LOAD_WORKLOADS)})")
+        try:
+            mix[name] = float(weight) if weight else 1.0
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"invalid weight for {name}: {weight}")
+    return mix
+
+def percentile(values, pct):
+    """Nearest-rank percentile"""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+def run_load(workers, mix, duration=None, total_requests=None):
+    """Run the checks from concurrent workers, returns {workload: [(latency_ms, passed, status)]}"""
+    global verbose
+    verbose = False
+
+    # One pooled keep-alive session, sized so no worker waits for a connection
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=workers, pool_block=True)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+
+    # Each response's status, so failures can be broken down (e.g. 429 vs 503)
+    last_status = threading.local()
+    session.hooks['response'].append(lambda response, *args, **kwargs: setattr(last_status, 'code', response.status_code))
+
+    response = session.get(f'{SERVER_URL}/agents', headers=auth_headers(), timeout=30)
+    agent_ids = [agent['id'] for agent in response.json().get('agents', [])] if response.status_code == 200 else []
+    if not agent_ids and 'agent_load' in mix:
+        raise RuntimeError(f"Can't list agents to load (status {response.status_code})")
+
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    results = {name: [] for name in names}
+    lock = threading.Lock()
+    remaining = [total_requests]
+    deadline = time.monotonic() + duration if duration else None
+
+    def claim():
+        """True while there is budget for another request"""
+        if deadline is not None and time.monotonic() >= deadline:
+            return False
+        if remaining[0] is None:
+            return True
+        with lock:
+            if remaining[0] <= 0:
+                return False
+            remaining[0] -= 1
+            return True
+
+    def worker():
+        local = {name: [] for name in names}
+        while claim():
+            name = random.choices(names, weights)[0]
+            last_status.code = None
+            start = time.perf_counter()
+            passed = LOAD_WORKLOADS[name](session, agent_ids)
+            local[name].append(((time.perf_counter() - start) * 1000, passed, last_status.code))
+        with lock:
+            for name, samples in local.items():
+                results[name].extend(samples)
+
+    threads = [threading.Thread(target=worker, name=f'load-{index}') for index in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    verbose = True
+    return results
+
+def print_load_report(results, elapsed):
+    """Print latency percentiles and error rates per workload and overall"""
+    print(f"{'workload':<12} {'requests':>9} {'req/s':>8} {'p50 ms':>8} {'p90 ms':>8} "
+          f"{'p95 ms':>8} {'p99 ms':>8} {'max ms':>8} {'errors':>7} {'error %':>8}")
+
+    rows = [(name, samples) for name, samples in results.items() if samples]
+    rows.append(('total', [sample for samples in results.values() for sample in samples]))
+
+    for name, samples in rows:
+        if not samples:
+            continue
+        latencies = [latency for latency, _, _ in samples]
+        errors = sum(1 for _, passed, _ in samples if not passed)
+        print(f"{name:<12} {len(samples):>9} {len(samples) / elapsed:>8.1f} "
+              f"{percentile(latencies, 50):>8.1f} {percentile(latencies, 90):>8.1f} "
+              f"{percentile(latencies, 95):>8.1f} {percentile(latencies, 99):>8.1f} "
+              f"{max(latencies):>8.1f} {errors:>7} {errors / len(samples):>8.1%}")
+
+    failures = {}
+    for samples in results.values():
+        for _, passed, status in samples:
+            if not passed:
+                failures[status] = failures.get(status, 0) + 1
+    if failures:
+        print()
+        labels = {None: 'no response', 200: '200 (check failed)'}
+        print("Failures by status: " + ', '.join(
+            f"{labels.get(status, status)}: {count}" for status, count in sorted(failures.items(), key=lambda item: -item[1])
+        ))
+        if 429 in failures:
+            print("   429 = rate limited - limits are per API key, see the rate limiting section of PERFORMANCE.md")
+
+def load_main(args):
+    """Load-test mode"""
+    print_header("AI Agent Server - Load Test")
+
+    budget = f"{args.requests} requests" if args.requests else f"{args.duration:.0f}s"
+    mix = ', '.join(f"{name}={weight:g}" for name, weight in args.mix.items())
+    print(f"{SERVER_URL}: {args.workers} workers, {budget}, mix {mix}")
+    print()
+
+    start = time.perf_counter()
+    try:
+        results = run_load(args.workers, args.mix,
+                           duration=None if args.requests else args.duration,
+                           total_requests=args.requests)
+    except (requests.RequestException, RuntimeError) as e:
+        print_test("Load test", False, str(e))
+        return 1
+    elapsed = time.perf_counter() - start
+
+    print_load_report(results, elapsed)
+    print()
+
+    failed = sum(1 for samples in results.values() for _, passed, _ in samples if not passed)
+    return 0 if not failed else 1
+
 def main():
     """Run all tests"""
     print_header("AI Agent Server - System Test")
@@ -219,9 +389,27 @@ def main():
 
     return 0 if all_passed else 1
 
+def parse_args():
+    """Command line options"""
+    global SERVER_URL
+
+    parser = argparse.ArgumentParser(description='Check the AI Agent Server, or load-test it with --load')
+    parser.add_argument('--url', default=SERVER_URL, help=f'Server to test (default {SERVER_URL})')
+    parser.add_argument('--load', action='store_true', help='Run the agent checks concurrently and report latency')
+    parser.add_argument('--workers', type=int, default=8, help='Concurrent workers (--load)')
+    parser.add_argument('--duration', type=float, default=30, help='Seconds to run (--load)')
+    parser.add_argument('--requests', type=int, help='Stop after this many requests instead of --duration (--load)')
+    parser.add_argument('--mix', type=parse_mix, default=parse_mix('agents=1,agent_load=3'),
+                        help='Workload weights (--load, default agents=1,agent_load=3)')
+    args = parser.parse_args()
+
+    SERVER_URL = args.url.rstrip('/')
+    return args
+
 if __name__ == '__main__':
     try:
-        sys.exit(main())
+        args = parse_args()
+        sys.exit(load_main(args) if args.load else main())
     except KeyboardInterrupt:
         print("\n\nTest cancelled by user")
         sys.exit(1)
@@ -0,0 +1,81 @@
+# test_rate_limit_store.py
+"""
+Tests for the SQLite rate limit storage, through the limits API flask-limiter uses
+
+Usage: python -m unittest discover tests
+"""
+
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from limits import parse
+from limits.storage import storage_from_string
+from limits.strategies import FixedWindowRateLimiter
+
+import rate_limit_store  # registers the sqlite:// scheme
+
+class SQLiteStorageTest(unittest.TestCase):
+    """SQLiteStorage as built from a storage URI"""
+
+    def setUp(self):
+        self.scratch = tempfile.TemporaryDirectory()
+        self.uri = f"sqlite:///{os.path.join(self.scratch.name, 'rate-limits.db')}"
+        self.storage = storage_from_string(self.uri)
+
+    def tearDown(self):
+        self.scratch.cleanup()
+
+    def test_uri_builds_sqlite_storage(self):
+        self.assertIsInstance(self.storage, rate_limit_store.SQLiteStorage)
+        self.assertTrue(self.storage.check())
+
+    def test_incr_counts_within_window(self):
+        self.assertEqual(self.storage.incr('key', 60), 1)
+        self.assertEqual(self.storage.incr('key', 60, amount=2), 3)
+        self.assertEqual(self.storage.get('key'), 3)
+        self.assertGreater(self.storage.get_expiry('key'), time.time())
+
+    def test_incr_starts_new_window_after_expiry(self):
+        self.storage.incr('key', 0.05)
+        time.sleep(0.1)
+        self.assertEqual(self.storage.get('key'), 0)
+        self.assertEqual(self.storage.incr('key', 60), 1)
+
+    def test_incr_purges_expired_windows(self):
+        self.storage.incr('stale', 0.01)
+        time.sleep(0.05)
+        for _ in range(rate_limit_store.PURGE_EVERY):
+            self.storage.incr('live', 60)
+        self.assertEqual(self.storage.purge(), 0)
+        self.assertEqual(self.storage.get('live'), rate_limit_store.PURGE_EVERY)
+
+    def test_storages_on_one_file_share_counts(self):
+        # What separate worker processes see
+        other = storage_from_string(self.uri)
+        self.storage.incr('key', 60)
+        other.incr('key', 60)
+        self.assertEqual(self.storage.get('key'), 2)
+
+    def test_fixed_window_limiter_enforces_limit(self):
+        limiter = FixedWindowRateLimiter(self.storage)
+        limit = parse('2/minute')
+        self.assertTrue(limiter.hit(limit, 'client'))
+        self.assertTrue(limiter.hit(limit, 'client'))
+        self.assertFalse(limiter.hit(limit, 'client'))
+        self.assertTrue(limiter.hit(limit, 'other-client'))
+
+    def test_clear_and_reset(self):
+        self.storage.incr('a', 60)
+        self.storage.incr('b', 60)
+        self.storage.clear('a')
+        self.assertEqual(self.storage.get('a'), 0)
+        self.assertEqual(self.storage.reset(), 1)
+
+if __name__ == '__main__':
+    unittest.main()
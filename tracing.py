@@ -0,0 +1,89 @@
+# tracing.py
+"""
+Lightweight request tracing for AI Agent Manager
+Per-request trace IDs and timed spans (Google calls, token refresh, handler
+phases) carried in a context variable, reported as Server-Timing and JSON
+"""
+
+import contextvars
+import logging
+import re
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+
+current_trace = contextvars.ContextVar('current_trace', default=None)
+
+# Server-Timing metric names must be HTTP tokens
+_TOKEN_UNSAFE = re.compile(r"[^A-Za-z0-9!#$%&'*+.^_`|~-]")
+
+class Trace:
+    """Spans recorded while serving one request"""
+
+    def __init__(self, trace_id=None):
+        self.trace_id = trace_id or secrets.token_hex(8)
+        self.started = time.perf_counter()
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def add(self, name, started, duration):
+        """Record a finished span (thread-safe - spans finish on worker threads)"""
+        with self._lock:
+            self.spans.append((name, started - self.started, duration))
+
+    def elapsed(self):
+        """Seconds since the trace started"""
+        return time.perf_counter() - self.started
+
+    def server_timing(self):
+        """Server-Timing header value: total time per span name, plus the whole request"""
+        totals = {}
+        with self._lock:
+            for name, _, duration in self.spans:
+                count, total = totals.get(name, (0, 0.0))
+                totals[name] = (count + 1, total + duration)
+
+        entries = []
+        for name, (count, total) in totals.items():
+            entry = f"{_TOKEN_UNSAFE.sub('_', name)};dur={total * 1000:.1f}"
+            if count > 1:
+                entry += f';desc="{count} calls"'
+            entries.append(entry)
+        entries.append(f"total;dur={self.elapsed() * 1000:.1f}")
+        return ', '.join(entries)
+
+    def to_dict(self):
+        """JSON-friendly trace with every span's offset and duration in ms"""
+        with self._lock:
+            spans = sorted(self.spans, key=lambda span: span[1])
+        return {
+            'trace_id': self.trace_id,
+            'duration_ms': round(self.elapsed() * 1000, 1),
+            'spans': [
+                {'name': name, 'start_ms': round(offset * 1000, 1), 'duration_ms': round(duration * 1000, 1)}
+                for name, offset, duration in spans
+            ]
+        }
+
+@contextmanager
+def span(name):
+    """Time a block as a span of the current trace (no-op outside a trace)"""
+    trace = current_trace.get()
+    if trace is None:
+        yield
+        return
+
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add(name, started, time.perf_counter() - started)
+
+class TraceIdFilter(logging.Filter):
+    """Stamp log records with the current trace ID ('-' outside requests)"""
+
+    def filter(self, record):
+        trace = current_trace.get()
+        record.trace_id = trace.trace_id if trace else '-'
+        return True
@@ -217,6 +217,30 @@ $result = Remove-SafeFile -FilePath "agent-server.log" -Description "Server log
 if ($result -eq 1) { $removedCount++ }
 if ($result -eq -1) { $errorCount++ }
 
+$result = Remove-SafeFile -FilePath "agent-store.db" -Description "Local agent store"
+if ($result -eq 1) { $removedCount++ }
+if ($result -eq -1) { $errorCount++ }
+
+$result = Remove-SafeFile -FilePath "agent-store.db-wal" -Description "Local agent store journal"
+if ($result -eq 1) { $removedCount++ }
+if ($result -eq -1) { $errorCount++ }
+
+$result = Remove-SafeFile -FilePath "agent-store.db-shm" -Description "Local agent store index"
+if ($result -eq 1) { $removedCount++ }
+if ($result -eq -1) { $errorCount++ }
+
+$result = Remove-SafeFile -FilePath "rate-limits.db" -Description "Rate limit counters"
+if ($result -eq 1) { $removedCount++ }
+if ($result -eq -1) { $errorCount++ }
+
+$result = Remove-SafeFile -FilePath "rate-limits.db-wal" -Description "Rate limit counters journal"
+if ($result -eq 1) { $removedCount++ }
+if ($result -eq -1) { $errorCount++ }
+
+$result = Remove-SafeFile -FilePath "rate-limits.db-shm" -Description "Rate limit counters index"
+if ($result -eq 1) { $removedCount++ }
+if ($result -eq -1) { $errorCount++ }
+
 $result = Remove-SafeFile -FilePath "GPT-CONFIG.txt" -Description "GPT configuration output"
 if ($result -eq 1) { $removedCount++ }
 if ($result -eq -1) { $errorCount++ }